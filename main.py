@@ -10,82 +10,98 @@ Usage:
     python main.py --nasdaq100               # Analyze Nasdaq-100 (large-cap tech/growth, 89 tickers)
     python main.py --all                     # Analyze all universes combined (de-duplicated)
     python main.py --sp500 --limit 50        # Limit analysis to first N stocks
+    python main.py --sp500 --workers 32      # Analyze N stocks concurrently (default 16)
+    python main.py --no-cache                # Ignore cached market data and fetch everything fresh
     python main.py --verbose                 # Enable debug output
 """
 
+import argparse
 import logging
 import sys
 from pathlib import Path
 from src.recommender import StockRecommender, get_sp500_tickers, get_russell3000_tickers, get_russell2000_tickers, get_nasdaq100_tickers, get_all_market_tickers
 
-# Create necessary directories
-Path('logs').mkdir(exist_ok=True)
-Path('output').mkdir(exist_ok=True)
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('logs/valuation_analysis.log')
-    ]
-)
 logger = logging.getLogger(__name__)
 
 
 def setup_logging(verbose: bool = False):
     """Setup logging configuration."""
+    # Only install handlers once, so importing main elsewhere never duplicates log lines
+    if not logging.getLogger().handlers:
+        Path('logs').mkdir(exist_ok=True)
+        logging.basicConfig(
+            level=logging.INFO,
+            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+            handlers=[
+                logging.StreamHandler(),
+                logging.FileHandler('logs/valuation_analysis.log')
+            ]
+        )
     level = logging.DEBUG if verbose else logging.INFO
     for handler in logging.root.handlers:
         handler.setLevel(level)
 
 
+def parse_args(argv=None) -> argparse.Namespace:
+    """Parse command-line arguments."""
+    parser = argparse.ArgumentParser(description='Find undervalued stocks using Buffett/Munger-style valuation.')
+    parser.add_argument('tickers', nargs='*', help='Ticker symbols to analyze (default: curated list)')
+    # Universe flags; if several are given the first in this order wins
+    parser.add_argument('--sp500', action='store_true', help='Analyze S&P 500 stocks')
+    parser.add_argument('--russell3000', action='store_true', help='Analyze Russell 3000 stocks')
+    parser.add_argument('--russell2000', action='store_true', help='Analyze Russell 2000 stocks')
+    parser.add_argument('--nasdaq100', action='store_true', help='Analyze Nasdaq-100 stocks')
+    parser.add_argument('--all', action='store_true', help='Analyze all universes combined (de-duplicated)')
+    parser.add_argument('--limit', type=int, help='Limit analysis to the first N stocks')
+    parser.add_argument('--workers', type=int, default=16, help='Stocks analyzed concurrently (default 16)')
+    parser.add_argument('--no-cache', dest='cache', action='store_false',
+                        help='Ignore cached market data and fetch everything fresh')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Enable debug output')
+    # Intermixed so tickers may appear before, between or after options
+    return parser.parse_intermixed_args(argv)
+
+
 def main():
     """Main entry point."""
-    verbose = '--verbose' in sys.argv or '-v' in sys.argv
+    args = parse_args()
+    verbose = args.verbose
     setup_logging(verbose)
-    # Determine which stocks to analyze
-    # Flags supported: --sp500, --russell2000, --russell3000, --nasdaq100, --all, or a list of tickers
-    limit = None
-    if '--limit' in sys.argv:
-        try:
-            idx = sys.argv.index('--limit')
-            limit = int(sys.argv[idx + 1])
-            logger.info(f"Limiting universe to first {limit} tickers")
-        except Exception:
-            logger.warning("Invalid --limit usage; ignoring limit")
+    Path('output').mkdir(exist_ok=True)
 
-    if '--sp500' in sys.argv:
+    limit = args.limit
+    if limit:
+        logger.info(f"Limiting universe to first {limit} tickers")
+    workers = max(1, args.workers)
+
+    if args.sp500:
         logger.info("Fetching S&P 500 stocks...")
         tickers = get_sp500_tickers()
         logger.info(f"Analyzing {len(tickers)} S&P 500 stocks (this may take several minutes)...")
-    elif '--russell3000' in sys.argv:
+    elif args.russell3000:
         logger.info("Fetching Russell 3000 stocks (comprehensive US market)...")
         tickers = get_russell3000_tickers()
         if not tickers:
             logger.error("Russell 3000 cache not found. Download from: https://www.kibot.com/Historical_Data/Russell_3000_Historical_Tick_Data.aspx")
             sys.exit(1)
         logger.info(f"Analyzing {len(tickers)} Russell 3000 stocks (this will take a long time)...")
-    elif '--russell2000' in sys.argv:
+    elif args.russell2000:
         logger.info("Fetching Russell 2000 stocks (small/mid-cap universe)...")
         tickers = get_russell2000_tickers()
         if not tickers:
             logger.info("Russell 2000 not found; using Russell 3000 as fallback")
-            from recommender import get_russell3000_tickers
             tickers = get_russell3000_tickers()
         logger.info(f"Analyzing {len(tickers)} Russell tickers (this may take several minutes)...")
-    elif '--nasdaq100' in sys.argv:
+    elif args.nasdaq100:
         logger.info("Fetching Nasdaq-100 stocks (large-cap tech/growth leaders)...")
         tickers = get_nasdaq100_tickers()
         logger.info(f"Analyzing {len(tickers)} Nasdaq-100 stocks (this may take several minutes)...")
-    elif '--all' in sys.argv:
+    elif args.all:
         logger.info("Fetching a broad market universe (S&P500 + Russell + Nasdaq-100)...")
         tickers = get_all_market_tickers()
         logger.info(f"Analyzing {len(tickers)} market tickers (this may take a long time)...")
-    elif len([a for a in sys.argv[1:] if not a.startswith('--')]) > 0:
-        # Analyze user-specified stocks (allow mixing flags)
-        tickers = [arg.upper() for arg in sys.argv[1:] if not arg.startswith('--')]
+    elif args.tickers:
+        # Analyze user-specified stocks
+        tickers = [t.upper() for t in args.tickers]
     else:
         # Default: analyze a curated list of well-known stocks
         logger.info("Using default stock list...")
@@ -100,13 +116,15 @@ def main():
 
     # Apply optional limit
     if limit and isinstance(tickers, (list, tuple)):
-        tickers = tickers[:limit]    # Run analysis
+        tickers = tickers[:limit]
+
+    # Run analysis
     try:
-        recommender = StockRecommender()
+        recommender = StockRecommender(cache=args.cache)
         logger.info(f"\nStarting analysis of {len(tickers)} stocks...\n")
         
         # Analyze and get recommendations
-        recommendations = recommender.analyze_universe(tickers, top_n=15)
+        recommendations = recommender.analyze_universe(tickers, top_n=15, max_workers=workers)
         
         # Display results
         if len(recommendations) > 0:
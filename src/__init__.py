@@ -2,6 +2,7 @@
 
 __all__ = [
     'data_fetcher',
+    'disk_cache',
     'valuation_calculator',
     'recommender',
 ]
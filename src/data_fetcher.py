@@ -6,53 +6,301 @@ Supports multiple data sources:
 - Can be extended with Finnhub, Alpha Vantage, or Robinhood APIs
 """
 
+import asyncio
 import yfinance as yf
 import pandas as pd
 import logging
-from typing import Dict, Optional, List
+import random
+import sys
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, Optional, List, TypeVar
 import time
 
+from .disk_cache import DiskCache
+
+try:
+    from yfinance.exceptions import YFRateLimitError
+except ImportError:  # yfinance < 0.2.51
+    YFRateLimitError = ()
+
+try:
+    # Private yfinance client (handles cookies/crumb); used for the raw quote endpoints
+    from yfinance.data import YfData
+except ImportError:
+    YfData = None
+
 logger = logging.getLogger(__name__)
 
+T = TypeVar('T')
+
+# Yahoo's quote endpoint accepts several comma-separated symbols per request
+QUOTE_URL = 'https://query1.finance.yahoo.com/v7/finance/quote'
+QUOTE_BATCH_SIZE = 20
+QUOTE_FIELDS = 'regularMarketPrice,sharesOutstanding,marketCap,trailingPE'
+
+# quoteSummary modules holding every info field extract_metrics reads
+# (Ticker.info pulls five modules plus a second quote request)
+QUOTE_SUMMARY_URL = 'https://query2.finance.yahoo.com/v10/finance/quoteSummary'
+QUOTE_SUMMARY_MODULES = 'price,financialData,defaultKeyStatistics'
+
+# On-disk cache lifetimes (seconds): prices move intraday, statements quarterly
+INFO_CACHE_TTL = 15 * 60
+STATEMENTS_CACHE_TTL = 24 * 60 * 60
+
+# In-memory entries kept per cache; enough for a full Russell 3000 scan
+MEMORY_CACHE_SIZE = 4096
+
+# Statement line-item aliases, in order of preference
+OCF_KEYS = ('Operating Cash Flow', 'Net Cash From Operating Activities')
+CAPEX_KEYS = (
+    'Capital Expenditures',
+    'Purchases of Property Plant and Equipment',
+    'Capital Allocation',
+    'Purchase of Property Plant and Equipment',
+)
+NET_INCOME_KEYS = (
+    'Net Income',
+    'Net Income Common Stockholders',
+    'Net Income From Continuing Operation Net Minority Interest',
+)
+EQUITY_KEYS = (
+    'Stockholders Equity',
+    'Common Stock Equity',
+    'Total Equity Gross Minority Interest',
+)
+PPE_KEYS = ('Property Plant Equipment', 'Property Plant and Equipment Net')
+
+
+# Retry policy for throttled Yahoo requests
+RETRY_STATUS_CODES = (401, 429, 503)
+MAX_RETRIES = 5
+MAX_BACKOFF = 30
+
+# Shared pacing for all Yahoo requests made by one DataFetcher (0 = unlimited)
+REQUESTS_PER_SECOND = 10
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    """Check whether an exception is a transient Yahoo throttling response."""
+    if isinstance(error, YFRateLimitError):
+        return True
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None) in RETRY_STATUS_CODES
+
+
+def _with_backoff(fn: Callable[[], T], retries: int = MAX_RETRIES) -> T:
+    """
+    Call fn, retrying rate-limited failures with jittered exponential backoff.
+    
+    Other errors, and the last rate-limited failure, are re-raised.
+    """
+    for attempt in range(retries):
+        try:
+            return fn()
+        except Exception as e:
+            if attempt == retries - 1 or not _is_rate_limited(e):
+                raise
+            wait = min(2 ** attempt + random.random(), MAX_BACKOFF)
+            logger.warning(f"Rate limited by Yahoo ({e}); retrying in {wait:.1f}s")
+            time.sleep(wait)
+
 
-def _estimate_capex_from_balance_sheet(balance_sheet, latest_cf, ticker: str) -> float:
+class RateLimiter:
+    """
+    Token bucket shared by worker threads to cap the overall request rate.
+    
+    Up to `burst` requests may start back to back; after that callers are
+    paced to `rate` requests per second.
+    """
+    
+    def __init__(self, rate: float, burst: int = 1):
+        """
+        Initialize RateLimiter.
+        
+        Args:
+            rate: Requests per second (0 or less disables limiting)
+            burst: Number of requests allowed without waiting
+        """
+        self.rate = rate
+        self.capacity = max(1, burst)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a request may start."""
+        if self.rate <= 0:
+            return
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+class _LRUCache(OrderedDict):
+    """Thread-safe dict that evicts its least recently used entry beyond maxsize."""
+    
+    def __init__(self, maxsize: int = MEMORY_CACHE_SIZE):
+        super().__init__()
+        self.maxsize = maxsize
+        # Reentrant: OrderedDict's C pop/popitem call back into __delitem__ on subclasses
+        self._lock = threading.RLock()
+    
+    def get(self, key, default=None):
+        with self._lock:
+            if key not in self:
+                return default
+            self.move_to_end(key)
+            return super().__getitem__(key)
+    
+    def __setitem__(self, key, value):
+        with self._lock:
+            super().__setitem__(key, value)
+            self.move_to_end(key)
+            if len(self) > self.maxsize:
+                self.popitem(last=False)
+    
+    def __delitem__(self, key):
+        with self._lock:
+            super().__delitem__(key)
+    
+    def pop(self, key, *default):
+        with self._lock:
+            return super().pop(key, *default)
+    
+    def clear(self):
+        with self._lock:
+            super().clear()
+
+
+def _new_session():
+    """
+    Create the HTTP session shared by every yfinance request of a DataFetcher.
+    
+    Prefers curl_cffi (installed with recent yfinance), falling back to a
+    pooled requests.Session so connections stay warm across tickers.
+    """
+    try:
+        from curl_cffi import requests as curl_requests
+        return curl_requests.Session(impersonate='chrome')
+    except ImportError:
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=20,
+            pool_maxsize=20,
+            # Server errors only; throttling (401/429/503) is retried by _with_backoff
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[500, 502, 504]),
+        )
+        session.mount('https://', adapter)
+        return session
+
+
+def _first_column(df: Optional[pd.DataFrame], position: int = 0) -> Dict:
+    """
+    Return one period of a statement as a plain {line item: value} dict.
+    
+    Dict lookups are far cheaper than pandas label lookups, and a missing
+    statement (or period) gives an empty dict.
+    """
+    if df is None or len(df.columns) <= position:
+        return {}
+    return df.iloc[:, position].to_dict()
+
+
+def _first_value(values: Dict, keys) -> float:
+    """Return the first non-missing, non-zero value among the given row labels, else 0."""
+    for key in keys:
+        value = values.get(key)
+        if value and not pd.isna(value):
+            return float(value)
+    return 0
+
+
+def _quote_values(info: Dict):
+    """Return (price, shares outstanding) from info, with missing values as 0."""
+    price = info.get('currentPrice') or info.get('regularMarketPrice') or 0
+    shares = info.get('sharesOutstanding') or 0
+    return price, shares
+
+
+def _flatten_quote_summary(data: Dict) -> Dict:
+    """Merge the modules of a quoteSummary response into one info-style dict."""
+    results = (data.get('quoteSummary') or {}).get('result') or [{}]
+    info = {}
+    for module in results[0].values():
+        if not isinstance(module, dict):
+            continue
+        for key, value in module.items():
+            if isinstance(value, dict):
+                value = value.get('raw')
+            if value is not None:
+                info.setdefault(key, value)
+    return info
+
+
+def _fetch_info(stock) -> Dict:
+    """
+    Fetch only the quoteSummary modules we use.
+    
+    Falls back to .info only when yfinance's internals don't fit (other
+    Ticker types, changed private API). An empty payload or a 404 means
+    Yahoo has no data for the symbol and returns {}; other request errors,
+    rate limiting included, are raised for the caller to handle.
+    """
+    client = getattr(stock, '_data', None)
+    if YfData is None or not isinstance(client, YfData):
+        return stock.info
+    try:
+        data = client.get_raw_json(
+            f"{QUOTE_SUMMARY_URL}/{stock.ticker}",
+            params={'modules': QUOTE_SUMMARY_MODULES, 'formatted': 'false', 'symbol': stock.ticker}
+        )
+        return _flatten_quote_summary(data)
+    except (AttributeError, TypeError) as e:
+        logger.debug("quoteSummary call failed for %s, falling back to .info: %s", stock.ticker, e)
+        return stock.info
+    except Exception as e:
+        if getattr(getattr(e, 'response', None), 'status_code', None) == 404:
+            return {}
+        raise
+
+
+def _estimate_capex_from_balance_sheet(balance_sheet, ticker: str) -> float:
     """
     Estimate CapEx from balance sheet changes when cash flow data is missing.
     
-    CapEx = (Current PPE + Current Depreciation) - (Prior PPE + Prior Depreciation)
+    CapEx ~= increase in PPE (Property, Plant & Equipment) over the latest quarter
     This is a fallback when CapEx line is missing or zero.
     """
     try:
         if balance_sheet is None or balance_sheet.empty or len(balance_sheet.columns) < 2:
             return 0
         
-        current_bs = balance_sheet.iloc[:, 0]
-        prior_bs = balance_sheet.iloc[:, 1]
-        
-        # Get PPE (Property, Plant & Equipment)
-        ppe_current = current_bs.get('Property Plant Equipment', 0) or 0
-        ppe_prior = prior_bs.get('Property Plant Equipment', 0) or 0
-        
-        # If no PPE, try alternative names
-        if not ppe_current:
-            ppe_current = current_bs.get('Property Plant and Equipment Net', 0) or 0
-        if not ppe_prior:
-            ppe_prior = prior_bs.get('Property Plant and Equipment Net', 0) or 0
-        
-        # Get accumulated depreciation (also typically listed)
-        acc_depr_current = abs(current_bs.get('Accumulated Depreciation', 0) or 0)
-        acc_depr_prior = abs(prior_bs.get('Accumulated Depreciation', 0) or 0)
+        # Get PPE, trying alternative names
+        ppe_current = _first_value(_first_column(balance_sheet, 0), PPE_KEYS)
+        ppe_prior = _first_value(_first_column(balance_sheet, 1), PPE_KEYS)
         
         # Estimate: If PPE increased, that's likely CapEx
         ppe_increase = max(ppe_current - ppe_prior, 0)
         
         if ppe_increase > 0:
-            logger.debug(f"{ticker}: Estimated CapEx from PPE change: ${ppe_increase/1e9:.2f}B")
+            logger.debug("%s: Estimated CapEx from PPE change: $%.2fB", ticker, ppe_increase / 1e9)
             return ppe_increase
         
         return 0
     except Exception as e:
-        logger.debug(f"Error estimating CapEx from balance sheet: {e}")
+        logger.debug("Error estimating CapEx from balance sheet: %s", e)
         return 0
 
 
@@ -66,48 +314,196 @@ class DataFetcher:
     - Reliable for fundamental analysis
     """
     
-    def __init__(self, cache_enabled: bool = True):
+    def __init__(
+        self,
+        cache_enabled: bool = True,
+        cache_dir: Optional[str] = '.cache',
+        session=None,
+        requests_per_second: float = REQUESTS_PER_SECOND,
+        ticker_factory: Optional[Callable[..., yf.Ticker]] = None
+    ):
         """
         Initialize DataFetcher.
         
         Args:
             cache_enabled: Cache stock info to reduce API calls
+            cache_dir: Directory for the persistent cache (None = memory only)
+            session: HTTP session for yfinance (default: new pooled session)
+            requests_per_second: Cap on Yahoo requests across all threads (0 = unlimited)
+            ticker_factory: Builds Ticker objects as factory(symbol, session=...)
+                (default: yf.Ticker; tests can pass a fake)
         """
         self.cache_enabled = cache_enabled
-        self.stock_cache = {}
-        self.data_cache = {}
+        self.session = session or _new_session()
+        self.stock_cache = _LRUCache()
+        # Thin v7 quotes from bulk_prefetch; only fill gaps in info, never replace it
+        self.quote_cache = _LRUCache()
+        self.data_cache = _LRUCache()
+        self.disk_cache = DiskCache(cache_dir) if cache_enabled and cache_dir else None
+        self.rate_limiter = RateLimiter(requests_per_second, burst=max(1, int(requests_per_second)))
+        self._ticker_factory = ticker_factory or yf.Ticker
+        # Ticker objects shared by the fetches of a get_metrics call in progress
+        self._tickers = {}
+        self._pooled = set()
+        self._tickers_lock = threading.Lock()
+    
+    def _ticker(self, ticker: str) -> yf.Ticker:
+        """Get the Ticker for a symbol: the pooled one if get_metrics holds it, else a new one."""
+        with self._tickers_lock:
+            stock = self._tickers.get(ticker)
+            if stock is None:
+                stock = self._ticker_factory(ticker, session=self.session)
+                if ticker in self._pooled:
+                    self._tickers[ticker] = stock
+            return stock
+    
+    def _hold_ticker(self, ticker: str):
+        """Start pooling a symbol's Ticker (built lazily on the first cache miss)."""
+        with self._tickers_lock:
+            self._pooled.add(ticker)
+            self._tickers.pop(ticker, None)
+    
+    def _release_ticker(self, ticker: str):
+        """Stop pooling a symbol and drop its Ticker (and the responses it memoizes)."""
+        with self._tickers_lock:
+            self._pooled.discard(ticker)
+            self._tickers.pop(ticker, None)
     
-    def get_stock_info(self, ticker: str, force_refresh: bool = False) -> Dict:
+    def _request(self, fn: Callable[[], T]) -> T:
+        """Run one Yahoo request under the shared rate limit, retrying throttled attempts."""
+        def attempt() -> T:
+            self.rate_limiter.acquire()
+            return fn()
+        return _with_backoff(attempt)
+    
+    def invalidate(self, ticker: str):
+        """Drop all cached data (memory and disk) for a ticker."""
+        self._release_ticker(ticker)
+        self.stock_cache.pop(ticker, None)
+        self.quote_cache.pop(ticker, None)
+        self.data_cache.pop(ticker, None)
+        if self.disk_cache:
+            self.disk_cache.delete((ticker, 'info'))
+            self.disk_cache.delete((ticker, 'quote'))
+            self.disk_cache.delete((ticker, 'statements'))
+    
+    def clear_cache(self):
+        """Drop the in-memory caches (the persistent cache is kept)."""
+        self.stock_cache.clear()
+        self.quote_cache.clear()
+        self.data_cache.clear()
+    
+    def get_stock_info(
+        self,
+        ticker: str,
+        force_refresh: bool = False,
+        stock: Optional[yf.Ticker] = None
+    ) -> Dict:
         """
         Get comprehensive stock information including financials.
         
         Args:
             ticker: Stock ticker symbol
             force_refresh: Ignore cache and fetch fresh data
+            stock: Existing yf.Ticker for this symbol (default: pooled instance)
             
         Returns:
             Dict with stock information
         """
-        if self.cache_enabled and ticker in self.stock_cache and not force_refresh:
-            return self.stock_cache[ticker]
+        if self.cache_enabled and not force_refresh:
+            info = self.stock_cache.get(ticker)
+            if info is not None:
+                return info
+            if self.disk_cache:
+                info = self.disk_cache.get((ticker, 'info'))
+                if info is not None:
+                    self.stock_cache[ticker] = info
+                    return info
         
         try:
             logger.info(f"Fetching info for {ticker}...")
-            stock = yf.Ticker(ticker)
-            info = stock.info
+            stock = stock or self._ticker(ticker)
+            info = self._request(lambda: _fetch_info(stock))
+            
+            quote = self.quote_cache.get(ticker) if self.cache_enabled else None
+            if info and quote:
+                info = {**quote, **info}
             
             if self.cache_enabled:
                 self.stock_cache[ticker] = info
+                if self.disk_cache and info:
+                    self.disk_cache.set((ticker, 'info'), info, expire=INFO_CACHE_TTL)
             
             return info
         except Exception as e:
             logger.error(f"Error fetching info for {ticker}: {e}")
             return {}
     
+    def bulk_prefetch(self, tickers: List[str]) -> int:
+        """
+        Warm the quote cache with quotes fetched 20 symbols per request.
+        
+        Quotes only carry price/shares fields, so they are kept apart from
+        the full info dicts and only fill fields a later info fetch lacks.
+        get_metrics drops tickers whose quote has no price or shares before
+        any per-ticker request; symbols a batch answered without are cached
+        as empty quotes so they are dropped too.
+        
+        Args:
+            tickers: List of ticker symbols
+            
+        Returns:
+            Number of tickers added to the quote cache
+        """
+        if not self.cache_enabled or YfData is None:
+            return 0
+        
+        pending = []
+        for ticker in tickers:
+            if ticker in self.stock_cache or ticker in self.quote_cache:
+                continue
+            quote = self.disk_cache.get((ticker, 'quote')) if self.disk_cache else None
+            if quote is not None:
+                self.quote_cache[ticker] = quote
+            else:
+                pending.append(ticker)
+        if not pending:
+            return 0
+        
+        cached = 0
+        for start in range(0, len(pending), QUOTE_BATCH_SIZE):
+            chunk = pending[start:start + QUOTE_BATCH_SIZE]
+            try:
+                data = self._request(lambda: YfData(session=self.session).get_raw_json(
+                    QUOTE_URL,
+                    params={'symbols': ','.join(chunk), 'fields': QUOTE_FIELDS}
+                ))
+                quotes = (data.get('quoteResponse') or {}).get('result') or []
+            except Exception as e:
+                logger.debug(f"Bulk quote fetch failed for {chunk[0]}..{chunk[-1]}: {e}")
+                continue
+            
+            by_symbol = {quote.get('symbol'): quote for quote in quotes}
+            # An empty result can't tell a failed batch from unknown symbols
+            if not by_symbol:
+                continue
+            for symbol in chunk:
+                quote = by_symbol.get(symbol, {})
+                self.quote_cache[symbol] = quote
+                if self.disk_cache:
+                    self.disk_cache.set((symbol, 'quote'), quote, expire=INFO_CACHE_TTL)
+                if quote:
+                    cached += 1
+        
+        logger.info(f"Prefetched quotes for {cached}/{len(pending)} tickers")
+        return cached
+    
     def get_financial_statements(
         self, 
         ticker: str, 
-        quarters: int = 4
+        quarters: int = 4,
+        force_refresh: bool = False,
+        stock: Optional[yf.Ticker] = None
     ) -> Dict[str, any]:
         """
         Get financial statements (cash flow, income, balance sheet).
@@ -115,28 +511,40 @@ class DataFetcher:
         Args:
             ticker: Stock ticker symbol
             quarters: Number of quarters to fetch
+            force_refresh: Ignore the persistent cache and fetch fresh data
+            stock: Existing yf.Ticker for this symbol (default: pooled instance)
             
         Returns:
             Dict with financial data
         """
+        if self.disk_cache and not force_refresh:
+            statements = self.disk_cache.get((ticker, 'statements'))
+            if statements is not None:
+                return statements
+        
         try:
             logger.info(f"Fetching financial statements for {ticker}...")
-            stock = yf.Ticker(ticker)
+            stock = stock or self._ticker(ticker)
             
             # Get most recent quarter data
-            cash_flow = stock.quarterly_cash_flow
-            income_stmt = stock.quarterly_income_stmt
-            balance_sheet = stock.quarterly_balance_sheet
+            cash_flow = self._request(lambda: stock.quarterly_cash_flow)
+            income_stmt = self._request(lambda: stock.quarterly_income_stmt)
+            balance_sheet = self._request(lambda: stock.quarterly_balance_sheet)
             
             if cash_flow is None or income_stmt is None or balance_sheet is None:
                 logger.warning(f"Missing financial data for {ticker}")
                 return {}
             
-            return {
+            statements = {
                 'cash_flow': cash_flow,
                 'income_stmt': income_stmt,
                 'balance_sheet': balance_sheet,
             }
+            # yfinance returns empty frames on failure; don't pin those for a day
+            if self.disk_cache and not any(df.empty for df in statements.values()):
+                self.disk_cache.set((ticker, 'statements'), statements, expire=STATEMENTS_CACHE_TTL)
+            
+            return statements
         except Exception as e:
             logger.error(f"Error fetching financial statements for {ticker}: {e}")
             return {}
@@ -154,89 +562,45 @@ class DataFetcher:
             Dict with extracted metrics or None if insufficient data
         """
         try:
-            # Price and shares from info
-            current_price = info.get('currentPrice') or info.get('regularMarketPrice', 0)
-            shares_outstanding = info.get('sharesOutstanding', 0)
+            # Price and shares from info; without them nothing below can be used
+            current_price, shares_outstanding = _quote_values(info)
+            if current_price <= 0 or shares_outstanding <= 0:
+                logger.debug("Insufficient data for %s: price=%s, shares=%s",
+                             ticker, current_price, shares_outstanding)
+                return None
             
             # Initialize from info dict
             operating_cash_flow = info.get('operatingCashflow', 0) or 0
             capex = info.get('capitalExpenditures', 0) or 0
             free_cash_flow = info.get('freeCashflow', 0) or 0
+            # Net income and equity come from the quarterly statements only,
+            # so ROE never mixes TTM and single-quarter figures
             net_income = 0
             total_equity = 0
             
             # Extract from financial statements (more reliable)
-            if financials and 'cash_flow' in financials:
-                cf_df = financials['cash_flow']
-                if cf_df is not None and len(cf_df.columns) > 0:
-                    try:
-                        latest_cf = cf_df.iloc[:, 0]
-                        # Try multiple common naming variations
-                        operating_cash_flow = operating_cash_flow or (
-                            latest_cf.get('Operating Cash Flow') or
-                            latest_cf.get('Net Cash From Operating Activities') or
-                            0
-                        )
-                        
-                        # CapEx extraction - try multiple field names
-                        # Note: CapEx is typically negative in cash flow, so we take abs()
-                        capex_candidates = [
-                            latest_cf.get('Capital Expenditures'),
-                            latest_cf.get('Purchases of Property Plant and Equipment'),
-                            latest_cf.get('Capital Allocation'),
-                            latest_cf.get('Purchase of Property Plant and Equipment'),
-                        ]
-                        
-                        for capex_val in capex_candidates:
-                            if capex_val and capex_val != 0:
-                                capex = abs(float(capex_val))
-                                break
-                        
-                        # If still zero, try extracting from balance sheet changes
-                        if not capex or capex == 0:
-                            capex = _estimate_capex_from_balance_sheet(
-                                financials.get('balance_sheet'), latest_cf, ticker
-                            )
-                    except Exception as e:
-                        logger.debug(f"Error extracting CapEx for {ticker}: {e}")
-                        pass
+            financials = financials or {}
+            latest_cf = _first_column(financials.get('cash_flow'))
+            latest_inc = _first_column(financials.get('income_stmt'))
+            latest_bs = _first_column(financials.get('balance_sheet'))
             
-            if financials and 'income_stmt' in financials:
-                inc_df = financials['income_stmt']
-                if inc_df is not None and len(inc_df.columns) > 0:
-                    try:
-                        latest_inc = inc_df.iloc[:, 0]
-                        # Use the most reliable net income field
-                        net_income = (
-                            latest_inc.get('Net Income') or
-                            latest_inc.get('Net Income Common Stockholders') or
-                            latest_inc.get('Net Income From Continuing Operation Net Minority Interest') or
-                            0
-                        )
-                    except Exception:
-                        pass
+            # Try multiple common naming variations
+            operating_cash_flow = operating_cash_flow or _first_value(latest_cf, OCF_KEYS)
+            # Note: CapEx is typically negative in cash flow, so we take abs()
+            capex = abs(_first_value(latest_cf, CAPEX_KEYS)) or capex
+            net_income = _first_value(latest_inc, NET_INCOME_KEYS)
+            total_equity = _first_value(latest_bs, EQUITY_KEYS)
             
-            if financials and 'balance_sheet' in financials:
-                bs_df = financials['balance_sheet']
-                if bs_df is not None and len(bs_df.columns) > 0:
-                    try:
-                        latest_bs = bs_df.iloc[:, 0]
-                        # Try multiple equity field names
-                        total_equity = (
-                            latest_bs.get('Stockholders Equity') or
-                            latest_bs.get('Common Stock Equity') or
-                            latest_bs.get('Total Equity Gross Minority Interest') or
-                            0
-                        )
-                    except Exception:
-                        pass
+            # If still zero, try extracting from balance sheet changes
+            if not capex:
+                capex = _estimate_capex_from_balance_sheet(financials.get('balance_sheet'), ticker)
             
             # Validate data - must have all required positive values
-            if (current_price <= 0 or shares_outstanding <= 0 or
-                operating_cash_flow <= 0 or net_income <= 0 or total_equity <= 0):
-                logger.debug(f"Insufficient data for {ticker}: "
-                            f"price={current_price}, shares={shares_outstanding}, "
-                            f"ocf={operating_cash_flow}, ni={net_income}, eq={total_equity}")
+            if operating_cash_flow <= 0 or net_income <= 0 or total_equity <= 0:
+                # Lazy %-formatting: this fires for many tickers and debug is usually off
+                logger.debug("Insufficient data for %s: price=%s, shares=%s, ocf=%s, ni=%s, eq=%s",
+                             ticker, current_price, shares_outstanding,
+                             operating_cash_flow, net_income, total_equity)
                 return None
             
             # Data quality warnings
@@ -246,26 +610,29 @@ class DataFetcher:
             
             # Flag: CapEx is zero or missing (likely data error)
             if capex == 0 or capex < operating_cash_flow * 0.01:
-                logger.warning(f"{ticker}: CapEx is zero or suspiciously low "
-                             f"(OCF: ${operating_cash_flow/1e9:.2f}B, CapEx: ${capex/1e9:.2f}B). "
-                             f"This may indicate missing or unreliable data.")
+                logger.warning("%s: CapEx is zero or suspiciously low "
+                               "(OCF: $%.2fB, CapEx: $%.2fB). "
+                               "This may indicate missing or unreliable data.",
+                               ticker, operating_cash_flow / 1e9, capex / 1e9)
             
             # Flag: FCF yield is unreasonably high (>20%)
             if fcf_yield > 0.20:
-                logger.warning(f"{ticker}: Very high FCF yield ({fcf_yield:.1%}). "
-                             f"This may indicate unsustainable cash generation or data error.")
+                logger.warning("%s: Very high FCF yield (%.1f%%). "
+                               "This may indicate unsustainable cash generation or data error.",
+                               ticker, fcf_yield * 100)
             
             # Flag: FCF is more than OCF (shouldn't happen if CapEx is positive)
             if fcf > operating_cash_flow and capex > 0:
-                logger.warning(f"{ticker}: FCF exceeds OCF (CapEx appears negative). "
-                             f"Data validation issue detected.")
+                logger.warning("%s: FCF exceeds OCF (CapEx appears negative). "
+                               "Data validation issue detected.", ticker)
             
             # Flag: Unusually low ROE for asset-light businesses (likely quarterly data)
             # Example: Visa/Mastercard have 40-50% ROE, if showing <20%, likely quarterly data
             if roe_calc < 0.15 and fcf_yield > 0.03 and capex == 0:
-                logger.warning(f"{ticker}: ROE appears unusually low ({roe_calc:.1%}) "
-                             f"with high FCF yield ({fcf_yield:.1%}). Likely quarterly data issue. "
-                             f"Consider data as unreliable.")
+                logger.warning("%s: ROE appears unusually low (%.1f%%) "
+                               "with high FCF yield (%.1f%%). Likely quarterly data issue. "
+                               "Consider data as unreliable.",
+                               ticker, roe_calc * 100, fcf_yield * 100)
             
             # Growth rate estimate - conservative default
             growth_rate = 0.06  # 6% default (will be overridden by sector rates)
@@ -298,14 +665,34 @@ class DataFetcher:
         Returns:
             Dict with metrics or None if unable to fetch
         """
-        if self.cache_enabled and ticker in self.data_cache and not force_refresh:
-            return self.data_cache[ticker]
-        
-        info = self.get_stock_info(ticker, force_refresh=force_refresh)
-        if not info:
-            return None
+        if self.cache_enabled and not force_refresh:
+            metrics = self.data_cache.get(ticker)
+            if metrics is not None:
+                return metrics
+            # A prefetched quote without price or shares rules the ticker out
+            # before its info and statement requests
+            quote = self.quote_cache.get(ticker)
+            if quote is not None:
+                price, shares = _quote_values(quote)
+                if price <= 0 or shares <= 0:
+                    logger.debug("No usable quote for %s; skipping info and statements", ticker)
+                    return None
         
-        financials = self.get_financial_statements(ticker)
+        # Both fetches share one pooled Ticker, built only on a cache miss and
+        # released afterwards so memoized responses don't accumulate
+        self._hold_ticker(ticker)
+        try:
+            info = self.get_stock_info(ticker, force_refresh=force_refresh)
+            if not info:
+                return None
+            price, shares = _quote_values(info)
+            if price <= 0 or shares <= 0:
+                logger.debug("No usable quote for %s; skipping statements", ticker)
+                return None
+            
+            financials = self.get_financial_statements(ticker, force_refresh=force_refresh)
+        finally:
+            self._release_ticker(ticker)
         metrics = self.extract_metrics(ticker, info, financials)
         
         if self.cache_enabled and metrics:
@@ -313,29 +700,100 @@ class DataFetcher:
         
         return metrics
     
-    def batch_get_metrics(self, tickers: List[str], delay: float = 0.1) -> Dict[str, Dict]:
+    def batch_get_metrics(
+        self,
+        tickers: List[str],
+        delay: float = 0,
+        max_workers: int = 8
+    ) -> Dict[str, Dict]:
         """
-        Fetch metrics for multiple stocks with rate limiting.
+        Fetch metrics for multiple stocks concurrently with rate limiting.
+        
+        Requests are I/O-bound, so a small thread pool overlaps the network
+        round-trips instead of waiting on each ticker in turn. Pacing comes
+        from the fetcher's shared rate limiter rather than per-worker sleeps.
         
         Args:
             tickers: List of ticker symbols
-            delay: Delay between requests (seconds)
+            delay: Extra pause after each ticker, per worker (seconds)
+            max_workers: Maximum number of concurrent requests
             
         Returns:
             Dict mapping tickers to metrics
         """
-        results = {}
-        for ticker in tickers:
+        def fetch(ticker: str) -> Optional[Dict]:
             try:
-                metrics = self.get_metrics(ticker)
-                if metrics:
-                    results[ticker] = metrics
-                    logger.info(f"✓ {ticker}")
-                else:
-                    logger.warning(f"✗ {ticker} - No data")
-            except Exception as e:
-                logger.error(f"✗ {ticker} - {e}")
+                return self.get_metrics(ticker)
+            finally:
+                if delay:
+                    time.sleep(delay)
+        
+        results = {}
+        if not tickers:
+            return results
+        
+        self.bulk_prefetch(tickers)
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(tickers))) as executor:
+            futures = {executor.submit(fetch, ticker): ticker for ticker in tickers}
+            for future in as_completed(futures):
+                ticker = futures[future]
+                try:
+                    metrics = future.result()
+                    if metrics:
+                        results[ticker] = metrics
+                        logger.info(f"✓ {ticker}")
+                    else:
+                        logger.warning(f"✗ {ticker} - No data")
+                except Exception as e:
+                    logger.error(f"✗ {ticker} - {e}")
+        
+        return results
+    
+    async def batch_get_metrics_async(
+        self,
+        tickers: List[str],
+        max_workers: int = 16
+    ) -> Dict[str, Dict]:
+        """
+        Async variant of batch_get_metrics for callers running an event loop.
+        
+        yfinance is synchronous, so each ticker is fetched on a worker thread
+        and awaited; the event loop stays free while requests are in flight.
+        
+        Args:
+            tickers: List of ticker symbols
+            max_workers: Maximum number of concurrent requests
             
-            time.sleep(delay)
+        Returns:
+            Dict mapping tickers to metrics
+        """
+        results = {}
+        if not tickers:
+            return results
+        
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=min(max_workers, len(tickers)))
+        try:
+            await loop.run_in_executor(executor, self.bulk_prefetch, tickers)
+            fetched = await asyncio.gather(
+                *(loop.run_in_executor(executor, self.get_metrics, ticker) for ticker in tickers),
+                return_exceptions=True
+            )
+        finally:
+            # Never wait on in-flight requests here: that would block the event
+            # loop when the caller cancels. cancel_futures needs Python 3.9+.
+            if sys.version_info >= (3, 9):
+                executor.shutdown(wait=False, cancel_futures=True)
+            else:
+                executor.shutdown(wait=False)
+        
+        for ticker, metrics in zip(tickers, fetched):
+            if isinstance(metrics, Exception):
+                logger.error(f"✗ {ticker} - {metrics}")
+            elif metrics:
+                results[ticker] = metrics
+            else:
+                logger.warning(f"✗ {ticker} - No data")
         
         return results
@@ -0,0 +1,108 @@
+"""
+Persistent on-disk cache for fetched market data.
+
+Fundamentals only change quarterly, so keeping fetched data between runs
+avoids re-downloading it from Yahoo Finance on every invocation.
+All entries live in a single SQLite file as pickled values with an expiry
+timestamp, so a scan opens one file instead of one per ticker.
+"""
+
+import logging
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DB_NAME = 'cache.sqlite3'
+
+
+class DiskCache:
+    """
+    Key/value store on the local filesystem with per-entry TTL.
+
+    Keys are tuples of strings such as ``(ticker, endpoint)``.
+    """
+
+    def __init__(self, directory: str = '.cache'):
+        """
+        Initialize DiskCache.
+
+        Args:
+            directory: Directory holding the cache database (created if missing)
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        # One connection shared by the fetch threads, serialized by the lock
+        self._db = sqlite3.connect(
+            str(self.directory / DB_NAME), timeout=30, check_same_thread=False
+        )
+        with self._lock, self._db:
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS entries '
+                '(key TEXT PRIMARY KEY, expires_at REAL NOT NULL, value BLOB NOT NULL)'
+            )
+            self._db.execute('DELETE FROM entries WHERE expires_at < ?', (time.time(),))
+
+    @staticmethod
+    def _key(key: Tuple[str, ...]) -> str:
+        return '/'.join(key)
+
+    def get(self, key: Tuple[str, ...]) -> Optional[Any]:
+        """
+        Get a cached value.
+
+        Returns:
+            The stored value, or None if missing, expired or unreadable
+        """
+        try:
+            with self._lock:
+                row = self._db.execute(
+                    'SELECT expires_at, value FROM entries WHERE key = ?', (self._key(key),)
+                ).fetchone()
+            if row is None:
+                return None
+            expires_at, blob = row
+            if expires_at < time.time():
+                return None
+            return pickle.loads(blob)
+        except Exception as e:
+            logger.debug(f"Discarding unreadable cache entry {key}: {e}")
+            return None
+
+    def set(self, key: Tuple[str, ...], value: Any, expire: float) -> None:
+        """
+        Store a value.
+
+        Args:
+            key: Cache key
+            value: Picklable value
+            expire: Time to live (seconds)
+        """
+        try:
+            blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+            with self._lock, self._db:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO entries (key, expires_at, value) VALUES (?, ?, ?)',
+                    (self._key(key), time.time() + expire, blob)
+                )
+        except Exception as e:
+            logger.debug(f"Failed to write cache entry {key}: {e}")
+
+    def delete(self, key: Tuple[str, ...]) -> None:
+        """Remove a cached value if present."""
+        try:
+            with self._lock, self._db:
+                self._db.execute('DELETE FROM entries WHERE key = ?', (self._key(key),))
+        except sqlite3.Error as e:
+            logger.debug(f"Failed to delete cache entry {key}: {e}")
+
+    def close(self) -> None:
+        """Close the underlying database."""
+        with self._lock:
+            self._db.close()
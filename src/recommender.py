@@ -4,8 +4,15 @@ Stock recommendation engine.
 Uses Buffett-Munger valuation to rank and recommend undervalued stocks.
 """
 
+import csv
+import functools
+import io
 import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
+import numpy as np
 import pandas as pd
 from .valuation_calculator import ValuationCalculator
 from .data_fetcher import DataFetcher
@@ -13,17 +20,146 @@ from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
+# Valuation signals encoded as small ints for the scoring kernel (anything else = 0)
+SIGNAL_CODES = {'HOLD': 1, 'BUY': 2, 'STRONG_BUY': 3}
+# Points awarded per signal code
+SIGNAL_POINTS = np.array([0, 5, 15, 20])
+
+# Analyses are scored and trimmed to the running top_n this many at a time
+SCORE_BATCH_SIZE = 256
+
+# Ticker lists fetched from the web are saved under data/ and refreshed weekly
+WEB_TICKER_CACHE_TTL = 7 * 24 * 60 * 60
+
+# Saved kibot.com Russell 3000 page, parsed into data/russell3000.txt when that is missing
+RUSSELL3000_HTML = Path('data/Russell 3000 Historical Tick Data.html')
+
+# Cell text that looks like a ticker, matched on raw bytes so the page is never decoded
+_TICKER_RE = re.compile(rb'>([A-Z]{1,5})<')
+_DOT_TO_DASH = str.maketrans('.', '-')
+# Markup words on that page that match the ticker pattern
+_NON_TICKER_WORDS = frozenset({
+    b'HTML', b'BODY', b'FORM', b'DIV', b'SPAN', b'TYPE', b'NAME', b'HREF', b'STYLE', b'CLASS', b'DATA', b'TEXT',
+})
+
+# Machine-readable S&P 500 constituents (datahub.io core dataset mirror)
+SP500_CONSTITUENTS_URL = (
+    "https://raw.githubusercontent.com/datasets/s-and-p-500-companies/main/data/constituents.csv"
+)
+
+
+def _score_kernel(
+    is_trap: np.ndarray,
+    trap_score: np.ndarray,
+    exceptional: np.ndarray,
+    primary_return: np.ndarray,
+    discount: np.ndarray,
+    signal_code: np.ndarray,
+    fcf_yield: np.ndarray
+) -> np.ndarray:
+    """
+    Score stocks from plain numeric arrays (0-100, higher = better).
+    
+    primary_return is ROIC % when available, else ROE %; signal_code uses SIGNAL_CODES.
+    """
+    signal_points = SIGNAL_POINTS[signal_code]
+
+    # CRITICAL: Value trap detection - max 20/100, reduced by trap severity
+    trap_scores = np.maximum(0, 20 * (1 - trap_score))
+    
+    # EXCEPTIONAL QUALITY: Buffett's principle - pay for quality
+    # Exceptional ROE (40%+) businesses can trade at premium (like Visa, Mastercard)
+    # Score based on: quality (heavy), signal (moderate), reasonableness (light)
+    exceptional_fcf = np.select(
+        [
+            (fcf_yield >= 3) & (fcf_yield <= 10),  # Exceptional biz can have higher yields
+            ((fcf_yield > 2) & (fcf_yield < 3)) | ((fcf_yield > 10) & (fcf_yield <= 15)),
+            fcf_yield <= 2,
+        ],
+        [25, 15, 5],
+        default=0,
+    )
+    exceptional_scores = np.minimum(35 + signal_points + exceptional_fcf, 100)
+    
+    # NORMAL QUALITY: Conservative scoring
+    # Business quality assessment (30 points max)
+    quality_score = np.select(
+        [primary_return >= 25, primary_return >= 20, primary_return >= 15,
+         primary_return >= 12, primary_return >= 8],
+        [30, 28, 22, 15, 8],
+        default=2,
+    )
+    
+    # Valuation discount (30 points max)
+    # Reasonable discounts warrant investment; extreme ones are suspicious
+    discount_score = np.select(
+        [
+            (discount >= 25) & (discount <= 60),
+            ((discount > 15) & (discount < 25)) | ((discount > 60) & (discount <= 80)),
+            (discount > 0) & (discount <= 15),
+            discount > 80,
+        ],
+        [30, 20, 10, 5],
+        default=0,
+    )
+    
+    # FCF sustainability (20 points max)
+    fcf_score = np.select(
+        [
+            (fcf_yield >= 3) & (fcf_yield <= 8),
+            ((fcf_yield > 2) & (fcf_yield < 3)) | ((fcf_yield > 8) & (fcf_yield <= 12)),
+            fcf_yield <= 2,
+            fcf_yield > 12,
+        ],
+        [20, 12, 5, 3],
+        default=0,
+    )
+    normal_scores = np.minimum(quality_score + discount_score + signal_points + fcf_score, 100)
+    
+    scores = np.where(is_trap, trap_scores, np.where(exceptional, exceptional_scores, normal_scores))
+    return scores.astype(float)
+
+
+# Columns shown by print_recommendations() unless show_all_columns is set
+DISPLAY_COLUMNS = [
+    'Ticker', 'Price', 'Intrinsic Value', 'MOS Value', 'Discount',
+    'Upside', 'Quality', 'ROE', 'FCF Yield', 'Sector', 'Rating', 'Signal', 'Score',
+]
+
+LEGEND = "\n".join([
+    "",
+    "=" * 140,
+    "Legend:",
+    "  MOS Value = Value with quality-adjusted Margin of Safety",
+    "  Discount = How much stock is discounted from intrinsic value",
+    "  Quality = EXCEPTIONAL (ROE >40% - network effects/moat) | EXCELLENT (>20%) | GOOD (>15%) | ADEQUATE (>10%) | POOR (<10%)",
+    "  Rating: SIGNIFICANTLY_UNDERVALUED | UNDERVALUED | FAIRLY_VALUED | OVERVALUED | VALUE_TRAP",
+    "  VALUE_TRAP = High FCF yield with low ROE (unsustainable cash generation)",
+    "  Signal: STRONG_BUY | BUY | HOLD | AVOID",
+    "  ROE = Return on Equity (>15% good, >20% excellent, >40% exceptional)",
+    "  FCF Yield = Free Cash Flow as % of stock price (3-8% is healthy)",
+    "  Sector = Industry classification with quality-appropriate growth expectations",
+    "=" * 140 + "\n",
+])
+
 
 class StockRecommender:
     """
     Recommends undervalued stocks based on comprehensive analysis.
     """
     
-    def __init__(self):
-        """Initialize the recommender."""
+    def __init__(self, cache: bool = True):
+        """
+        Initialize the recommender.
+        
+        Args:
+            cache: Reuse fetched data from memory and the on-disk cache
+                (False = always fetch fresh data, nothing is stored)
+        """
         self.calculator = ValuationCalculator()
-        self.fetcher = DataFetcher()
+        self.fetcher = DataFetcher(cache_enabled=cache)
         self.analyses = []
+        self.results = pd.DataFrame()
     
     def analyze_stock(self, ticker: str) -> Optional[Dict]:
         """
@@ -35,6 +171,27 @@ class StockRecommender:
         Returns:
             Analysis dict or None if unable to analyze
         """
+        analysis = self._analyze_unscored(ticker)
+        if analysis is None:
+            return None
+        
+        # Check if it's a value trap - flag for potential exclusion
+        is_value_trap = analysis['value_trap_flag']['is_trap']
+        
+        # Special handling for exceptional ROE businesses
+        # These may look overvalued by DCF but are justified by moat + durability
+        exceptional_quality = analysis['quality']['quality'] == 'EXCEPTIONAL'
+        
+        # Add recommendation score (0-100)
+        # Value traps get severe penalty; exceptional quality gets boost
+        analysis['recommendation_score'] = self._calculate_score(
+            analysis, is_value_trap, exceptional_quality
+        )
+        
+        return analysis
+    
+    def _analyze_unscored(self, ticker: str) -> Optional[Dict]:
+        """Fetch metrics and run the valuation for a stock, without scoring it."""
         try:
             metrics = self.fetcher.get_metrics(ticker)
             if not metrics:
@@ -72,19 +229,6 @@ class StockRecommender:
                 'roic_percent': (analysis['metrics']['roic'] * 100) if analysis['metrics']['roic'] else None,
             }
             
-            # Check if it's a value trap - flag for potential exclusion
-            is_value_trap = analysis['value_trap_flag']['is_trap']
-            
-            # Special handling for exceptional ROE businesses
-            # These may look overvalued by DCF but are justified by moat + durability
-            exceptional_quality = analysis['quality']['quality'] == 'EXCEPTIONAL'
-            
-            # Add recommendation score (0-100)
-            # Value traps get severe penalty; exceptional quality gets boost
-            analysis['recommendation_score'] = self._calculate_score(
-                analysis, is_value_trap, exceptional_quality
-            )
-            
             return analysis
         except Exception as e:
             logger.error(f"Error analyzing {ticker}: {e}")
@@ -95,6 +239,32 @@ class StockRecommender:
         """
         Calculate a recommendation score (0-100) where higher = better.
         
+        Single-stock convenience wrapper around _calculate_scores().
+        """
+        inputs = pd.DataFrame([self._score_inputs(analysis, is_value_trap, exceptional_quality)])
+        return float(self._calculate_scores(inputs)[0])
+    
+    @staticmethod
+    def _score_inputs(analysis: Dict, is_value_trap: bool, exceptional_quality: bool) -> Dict:
+        """Collect the raw fields the scoring model reads from an analysis."""
+        quality_metrics = analysis['quality_metrics']
+        assessment = analysis['assessment']
+        return {
+            'ticker': analysis['ticker'],
+            'is_value_trap': is_value_trap,
+            'trap_score': analysis['value_trap_flag']['trap_score'] if is_value_trap else 0.0,
+            'exceptional_quality': exceptional_quality,
+            'roe_percent': quality_metrics['roe_percent'],
+            'roic_percent': quality_metrics.get('roic_percent'),
+            'discount': assessment['discount'],
+            'signal': assessment['signal'],
+            'fcf_yield': quality_metrics['fcf_yield'],
+        }
+    
+    def _calculate_scores(self, inputs: pd.DataFrame) -> np.ndarray:
+        """
+        Calculate recommendation scores (0-100) for many stocks at once.
+        
         Improved scoring that favors quality:
         - Value trap severity (penalize heavily)
         - Business quality/ROE (30%)
@@ -102,185 +272,179 @@ class StockRecommender:
         - Signal strength (20%)
         - FCF sustainability (20%)
         - Exceptional quality: Allow premium valuations (Berkshire principle)
-        """
-        score = 0
         
-        # CRITICAL: Value trap detection - penalize severely
-        if is_value_trap:
-            base_score = 20  # Max 20/100 for value traps
-            trap_score = analysis['value_trap_flag']['trap_score']
-            score += max(0, base_score * (1 - trap_score))
-            logger.debug(f"{analysis['ticker']}: VALUE TRAP DETECTED - Score capped at ~{score:.1f}")
-            return score
-        
-        # EXCEPTIONAL QUALITY: Buffett's principle - pay for quality
-        # Exceptional ROE (40%+) businesses can trade at premium (like Visa, Mastercard)
-        if exceptional_quality:
-            roe = analysis['quality_metrics']['roe_percent']
-            
-            # For exceptional quality, valuation is less important than moat durability
-            # Score based on: quality (heavy), signal (moderate), reasonableness (light)
-            score += 35  # High base for exceptional quality
-            
-            # Signal quality
-            signal = analysis['assessment']['signal']
-            if signal == 'STRONG_BUY':
-                score += 20
-            elif signal == 'BUY':
-                score += 15
-            elif signal == 'HOLD':
-                score += 5
-            
-            # FCF sustainability for exceptional businesses
-            fcf_yield = analysis['quality_metrics']['fcf_yield']
-            if 3 <= fcf_yield <= 10:  # Exceptional biz can have higher yields
-                score += 25
-            elif 2 < fcf_yield < 3 or 10 < fcf_yield <= 15:
-                score += 15
-            elif fcf_yield <= 2:
-                score += 5
+        Args:
+            inputs: One row per stock with the columns of _score_inputs()
             
-            return min(score, 100)
-        
-        # NORMAL QUALITY: Conservative scoring
-        # Business quality assessment (30 points max)
-        roe = analysis['quality_metrics']['roe_percent']
-        roic = analysis['quality_metrics']['roic_percent']
-        
-        primary_return = roic if roic else roe
-        
-        if primary_return >= 25:
-            quality_score = 30
-        elif primary_return >= 20:
-            quality_score = 28
-        elif primary_return >= 15:
-            quality_score = 22
-        elif primary_return >= 12:
-            quality_score = 15
-        elif primary_return >= 8:
-            quality_score = 8
-        else:
-            quality_score = 2
-        
-        score += quality_score
-        
-        # Valuation discount (30 points max)
-        # Reasonable discounts warrant investment; extreme ones are suspicious
-        discount = analysis['assessment']['discount']
-        if 25 <= discount <= 60:
-            discount_score = 30
-        elif 15 < discount < 25 or 60 < discount <= 80:
-            discount_score = 20
-        elif 0 < discount <= 15:
-            discount_score = 10
-        elif discount > 80:
-            discount_score = 5
-            logger.debug(f"{analysis['ticker']}: Extreme discount ({discount:.1f}%) - suspicious")
-        else:
-            discount_score = 0
-        
-        score += discount_score
-        
-        # Signal strength (20 points max)
-        signal = analysis['assessment']['signal']
-        if signal == 'STRONG_BUY':
-            score += 20
-        elif signal == 'BUY':
-            score += 15
-        elif signal == 'HOLD':
-            score += 5
-        else:
-            score += 0
+        Returns:
+            Array of scores aligned with the rows of inputs
+        """
+        is_trap = inputs['is_value_trap'].to_numpy(dtype=bool)
+        exceptional = inputs['exceptional_quality'].to_numpy(dtype=bool)
+        roe = inputs['roe_percent'].to_numpy(dtype=float)
+        roic = pd.to_numeric(inputs['roic_percent'], errors='coerce').to_numpy(dtype=float)
+        discount = inputs['discount'].to_numpy(dtype=float)
+        fcf_yield = inputs['fcf_yield'].to_numpy(dtype=float)
         
-        # FCF sustainability (20 points max)
-        fcf_yield = analysis['quality_metrics']['fcf_yield']
+        scores = _score_kernel(
+            is_trap,
+            inputs['trap_score'].to_numpy(dtype=float),
+            exceptional,
+            np.where(np.isnan(roic) | (roic == 0), roe, roic),
+            discount,
+            inputs['signal'].map(SIGNAL_CODES).fillna(0).to_numpy(dtype=np.int8),
+            fcf_yield,
+        )
         
-        if 3 <= fcf_yield <= 8:
-            fcf_score = 20
-        elif 2 < fcf_yield < 3 or 8 < fcf_yield <= 12:
-            fcf_score = 12
-        elif fcf_yield <= 2:
-            fcf_score = 5
-        elif fcf_yield > 12:
-            fcf_score = 3
-            logger.debug(f"{analysis['ticker']}: High FCF yield ({fcf_yield:.1f}%) - may not be sustainable")
-        else:
-            fcf_score = 0
+        if logger.isEnabledFor(logging.DEBUG):
+            normal = ~is_trap & ~exceptional
+            tickers = inputs['ticker'].to_numpy()
+            for i in np.flatnonzero(is_trap):
+                logger.debug(f"{tickers[i]}: VALUE TRAP DETECTED - Score capped at ~{scores[i]:.1f}")
+            for i in np.flatnonzero(normal & (discount > 80)):
+                logger.debug(f"{tickers[i]}: Extreme discount ({discount[i]:.1f}%) - suspicious")
+            for i in np.flatnonzero(normal & (fcf_yield > 12)):
+                logger.debug(f"{tickers[i]}: High FCF yield ({fcf_yield[i]:.1f}%) - may not be sustainable")
         
-        score += fcf_score
-        
-        return min(score, 100)
+        return scores
     
-    def analyze_universe(self, tickers: List[str], top_n: int = 10) -> pd.DataFrame:
+    def analyze_universe(
+        self,
+        tickers: List[str],
+        top_n: int = 10,
+        max_workers: int = 16
+    ) -> pd.DataFrame:
         """
         Analyze a universe of stocks and return top recommendations.
         
+        Tickers are analyzed on a thread pool since each analysis is
+        dominated by network I/O in the data fetcher. They are submitted and
+        scored SCORE_BATCH_SIZE at a time and only the running top_n are
+        kept, so memory is bounded by one window plus top_n rather than
+        growing with the universe.
+        
         Args:
             tickers: List of ticker symbols to analyze
             top_n: Number of top recommendations to return
+            max_workers: Number of tickers analyzed concurrently
             
         Returns:
             DataFrame with top recommendations sorted by score
         """
+        # Overlapping universes or repeated --tickers would otherwise be analyzed twice
+        tickers = list(dict.fromkeys(tickers))
         logger.info(f"Analyzing {len(tickers)} stocks...")
         
-        self.analyses = []
         successful = 0
+        self.analyses = []
+        self.results = pd.DataFrame()
         
-        for ticker in tickers:
-            analysis = self.analyze_stock(ticker)
-            if analysis:
-                self.analyses.append(analysis)
-                successful += 1
-                logger.info(f"✓ {ticker} - Score: {analysis['recommendation_score']:.1f}")
-            else:
-                logger.debug(f"✗ {ticker}")
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as executor:
+            # executor.map submits everything up front, so feed it one window at a time
+            for start in range(0, len(tickers), SCORE_BATCH_SIZE):
+                window = tickers[start:start + SCORE_BATCH_SIZE]
+                batch = []
+                for ticker, analysis in zip(window, executor.map(self._analyze_unscored, window)):
+                    if analysis:
+                        successful += 1
+                        batch.append(analysis)
+                    else:
+                        logger.debug("✗ %s", ticker)
+                if batch:
+                    self._keep_top(batch, top_n)
         
         logger.info(f"Successfully analyzed {successful}/{len(tickers)} stocks")
         
-        # Convert to DataFrame
-        df = self._analyses_to_dataframe(self.analyses)
+        # Convert to DataFrame (rows are already ranked)
+        df = self._format_results(self.results)
         
         if len(df) == 0:
             logger.warning("No successful analyses to rank")
-            return df
         
-        # Sort by recommendation score (descending) and then by discount
-        if 'recommendation_score' in df.columns and 'discount_percent' in df.columns:
-            df = df.sort_values(['recommendation_score', 'discount_percent'], ascending=[False, False])
+        return df
+    
+    def _keep_top(self, batch: List[Dict], top_n: int):
+        """
+        Score a batch of analyses and merge it into the running top_n.
+        
+        self.results and self.analyses hold the best rows so far, ranked by
+        score and then discount; everything else is dropped.
+        """
+        # Flatten once into columns, then score the batch in one vectorized pass
+        columns = self._analyses_to_columns(batch)
+        columns['recommendation_score'] = self._calculate_scores(columns)
+        for analysis, score in zip(batch, columns['recommendation_score']):
+            analysis['recommendation_score'] = float(score)
+            logger.info(f"✓ {analysis['ticker']} - Score: {score:.1f}")
+        
+        if len(self.results):
+            columns = pd.concat([self.results, columns], ignore_index=True)
+        candidates = self.analyses + batch
+        
+        # Partial selection; keep='first' puts earlier tickers first on ties, as a full sort would
+        order = columns.nlargest(max(0, top_n), ['recommendation_score', 'discount'], keep='first').index
+        self.results = columns.loc[order].reset_index(drop=True)
+        self.analyses = [candidates[i] for i in order]
+    
+    @staticmethod
+    def _analyses_to_columns(analyses: List[Dict]) -> pd.DataFrame:
+        """
+        Flatten nested analysis dicts into one columnar DataFrame.
         
-        return df.head(top_n)
+        Columns include everything _calculate_scores() and _format_results() read,
+        so downstream steps work column-wise instead of walking dicts per row.
+        """
+        return pd.DataFrame({
+            'ticker': [a['ticker'] for a in analyses],
+            'current_price': [a['current_price'] for a in analyses],
+            'intrinsic_value': [a['valuation']['intrinsic_value'] for a in analyses],
+            'value_with_mos': [a['valuation']['value_with_margin_of_safety'] for a in analyses],
+            'discount': [a['assessment']['discount'] for a in analyses],
+            'upside': [a['assessment'].get('upside_potential', 0) for a in analyses],
+            'rating': [a['assessment']['rating'] for a in analyses],
+            'signal': [a['assessment']['signal'] for a in analyses],
+            'is_value_trap': [a['value_trap_flag']['is_trap'] for a in analyses],
+            'trap_score': [a['value_trap_flag']['trap_score'] for a in analyses],
+            'quality': [a['quality']['quality'] for a in analyses],
+            'exceptional_quality': [a['quality']['quality'] == 'EXCEPTIONAL' for a in analyses],
+            'roe_percent': [a['quality_metrics']['roe_percent'] for a in analyses],
+            'roic_percent': [a['quality_metrics']['roic_percent'] or np.nan for a in analyses],
+            'fcf_yield': [a['quality_metrics']['fcf_yield'] for a in analyses],
+            'growth_rate': [a['valuation']['growth_rate'] for a in analyses],
+            'sector': [a['valuation']['sector'] for a in analyses],
+            'recommendation_score': [a.get('recommendation_score', np.nan) for a in analyses],
+        })
     
     def _analyses_to_dataframe(self, analyses: List[Dict]) -> pd.DataFrame:
         """Convert analysis results to DataFrame for easy viewing."""
-        rows = []
-        for analysis in analyses:
-            # Determine display rating (check for value trap)
-            is_trap = analysis['value_trap_flag']['is_trap']
-            display_rating = "VALUE_TRAP" if is_trap else analysis['assessment']['rating']
-            
-            row = {
-                'Ticker': analysis['ticker'],
-                'Price': f"${analysis['current_price']:.2f}",
-                'Intrinsic Value': f"${analysis['valuation']['intrinsic_value']:.2f}",
-                'MOS Value': f"${analysis['valuation']['value_with_margin_of_safety']:.2f}",
-                'discount_percent': analysis['assessment']['discount'],
-                'Discount': f"{analysis['assessment']['discount']:.1f}%",
-                'Upside': f"{analysis['assessment']['upside_potential']:.1f}%",
-                'Rating': display_rating,
-                'Signal': analysis['assessment']['signal'],
-                'Quality': analysis['quality']['quality'],
-                'ROE': f"{analysis['quality_metrics']['roe_percent']:.1f}%",
-                'ROIC': f"{analysis['quality_metrics']['roic_percent']:.1f}%" if analysis['quality_metrics']['roic_percent'] else "N/A",
-                'FCF Yield': f"{analysis['quality_metrics']['fcf_yield']:.2f}%",
-                'Growth Rate': f"{analysis['valuation']['growth_rate']:.1f}%",
-                'Sector': analysis['valuation']['sector'],
-                'recommendation_score': analysis['recommendation_score'],
-                'Score': f"{analysis['recommendation_score']:.1f}",
-            }
-            rows.append(row)
+        return self._format_results(self._analyses_to_columns(analyses))
+    
+    @staticmethod
+    def _format_results(raw: pd.DataFrame) -> pd.DataFrame:
+        """Build the display DataFrame from the columnar results."""
+        if len(raw) == 0:
+            return pd.DataFrame()
         
-        return pd.DataFrame(rows)
+        return pd.DataFrame({
+            'Ticker': raw['ticker'],
+            'Price': raw['current_price'].map('${:.2f}'.format),
+            'Intrinsic Value': raw['intrinsic_value'].map('${:.2f}'.format),
+            'MOS Value': raw['value_with_mos'].map('${:.2f}'.format),
+            'discount_percent': raw['discount'],
+            'Discount': raw['discount'].map('{:.1f}%'.format),
+            'Upside': raw['upside'].map('{:.1f}%'.format),
+            # Determine display rating (check for value trap)
+            'Rating': raw['rating'].where(~raw['is_value_trap'], 'VALUE_TRAP'),
+            'Signal': raw['signal'],
+            'Quality': raw['quality'],
+            'ROE': raw['roe_percent'].map('{:.1f}%'.format),
+            'ROIC': raw['roic_percent'].map('{:.1f}%'.format).where(raw['roic_percent'].notna(), 'N/A'),
+            'FCF Yield': raw['fcf_yield'].map('{:.2f}%'.format),
+            'Growth Rate': raw['growth_rate'].map('{:.1f}%'.format),
+            'Sector': raw['sector'],
+            'recommendation_score': raw['recommendation_score'],
+            'Score': raw['recommendation_score'].map('{:.1f}'.format),
+        })
     
     def print_recommendations(self, df: pd.DataFrame, show_all_columns: bool = False):
         """Pretty print recommendations."""
@@ -291,47 +455,153 @@ class StockRecommender:
         if show_all_columns:
             print(df.to_string(index=False))
         else:
-            display_cols = ['Ticker', 'Price', 'Intrinsic Value', 'MOS Value', 'Discount', 
-                          'Upside', 'Quality', 'ROE', 'FCF Yield', 'Sector', 'Rating', 'Signal', 'Score']
-            cols_to_show = [c for c in display_cols if c in df.columns]
-            print(df[cols_to_show].to_string(index=False))
+            cols_to_show = [c for c in DISPLAY_COLUMNS if c in df.columns]
+            print(df.to_string(columns=cols_to_show, index=False))
         
-        print("\n" + "="*140)
-        print("Legend:")
-        print("  MOS Value = Value with quality-adjusted Margin of Safety")
-        print("  Discount = How much stock is discounted from intrinsic value")
-        print("  Quality = EXCEPTIONAL (ROE >40% - network effects/moat) | EXCELLENT (>20%) | GOOD (>15%) | ADEQUATE (>10%) | POOR (<10%)")
-        print("  Rating: SIGNIFICANTLY_UNDERVALUED | UNDERVALUED | FAIRLY_VALUED | OVERVALUED | VALUE_TRAP")
-        print("  VALUE_TRAP = High FCF yield with low ROE (unsustainable cash generation)")
-        print("  Signal: STRONG_BUY | BUY | HOLD | AVOID")
-        print("  ROE = Return on Equity (>15% good, >20% excellent, >40% exceptional)")
-        print("  FCF Yield = Free Cash Flow as % of stock price (3-8% is healthy)")
-        print("  Sector = Industry classification with quality-appropriate growth expectations")
-        print("="*140 + "\n")
+        print(LEGEND)
+
+
+def merge_recommendations(frames: List[pd.DataFrame], top_n: Optional[int] = None) -> pd.DataFrame:
+    """
+    Combine recommendation frames from several analyze_universe() runs.
+    
+    Frames are concatenated once (never appended in a loop), a ticker seen in
+    more than one frame keeps its best-scored row, and the result is re-ranked.
+    
+    Args:
+        frames: DataFrames returned by analyze_universe()
+        top_n: Optional number of rows to keep
+        
+    Returns:
+        Ranked DataFrame in the same format as analyze_universe()
+    """
+    frames = [f for f in frames if len(f)]
+    if not frames:
+        return pd.DataFrame()
+    
+    merged = pd.concat(frames, ignore_index=True)
+    merged = merged.sort_values(
+        ['recommendation_score', 'discount_percent'], ascending=[False, False], kind='stable'
+    ).drop_duplicates('Ticker').reset_index(drop=True)
+    return merged if top_n is None else merged.head(top_n)
+
+
+def _memoize_tickers(loader):
+    """
+    Memoize a ticker-list loader for the lifetime of the process.
+    
+    Callers get a fresh list each time, so mutating it can't corrupt the cache.
+    Use loader.cache_clear() to force a reload.
+    """
+    cached = functools.lru_cache(maxsize=1)(lambda: tuple(loader()))
+    
+    @functools.wraps(loader)
+    def wrapper() -> List[str]:
+        return list(cached())
+    
+    wrapper.cache_clear = cached.cache_clear
+    return wrapper
+
+
+def _load_ticker_file(path: Path) -> List[str]:
+    """
+    Read a one-ticker-per-line file, normalized to upper case with '-' class separators.
+    
+    Returns:
+        Ticker list, or [] if the file is missing or unreadable
+    """
+    try:
+        lines = path.read_text().splitlines()
+    except (OSError, ValueError) as e:
+        logger.debug(f'Failed to read ticker file {path}: {e}')
+        return []
+    return [t.upper().translate(_DOT_TO_DASH) for t in map(str.strip, lines) if t]
+
+
+def _table_symbols(content: bytes) -> List[str]:
+    """
+    Extract the Symbol/Ticker column from a Wikipedia index page with lxml XPath.
+    
+    Prefers the table with id="constituents", then any wikitable; only that
+    one column is read instead of building every table on the page.
+    """
+    from lxml import html
+    tree = html.fromstring(content)
+    tables = tree.xpath('//table[@id="constituents"]') or tree.xpath('//table[contains(@class, "wikitable")]')
+    for table in tables:
+        headers = [th.text_content().strip().lower() for th in table.xpath('.//tr[th][1]/th')]
+        column = next((i for i, h in enumerate(headers) if 'symbol' in h or 'ticker' in h), None)
+        if column is None:
+            continue
+        cells = table.xpath(f'.//tr/td[{column + 1}]')
+        tickers = [c.text_content().strip().replace('.', '-') for c in cells]
+        tickers = [t for t in tickers if t]
+        if tickers:
+            return tickers
+    return []
 
 
+def _is_stale(path: Path) -> bool:
+    """Check whether a web-fetched ticker cache is older than WEB_TICKER_CACHE_TTL."""
+    return time.time() - path.stat().st_mtime > WEB_TICKER_CACHE_TTL
+
+
+def _save_tickers(path: Path, tickers: List[str]):
+    """Save a web-fetched ticker list so later runs can skip the fetch and HTML parse."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text('\n'.join(tickers) + '\n')
+    except OSError as e:
+        logger.debug(f"Failed to save ticker cache {path}: {e}")
+
+
+@_memoize_tickers
 def get_sp500_tickers() -> List[str]:
     """Get S&P 500 tickers for analysis."""
     import requests
     # If a local cached file exists, prefer it (offline-friendly)
     # Prefer tracked cache/ directory for reliable offline operation
-    cache_priorities = [Path('cache/sp500.txt'), Path('data/sp500.txt')]
+    web_cache = Path('data/sp500.txt')
+    cache_priorities = [Path('cache/sp500.txt'), web_cache]
+    stale = []
     for cache in cache_priorities:
-        if cache.exists():
-            try:
-                with cache.open() as f:
-                    tickers = [l.strip().upper().replace('.', '-') for l in f if l.strip()]
-                    if tickers:
-                        return tickers
-            except Exception:
-                logger.debug(f'Failed to read local S&P500 cache at {cache}; trying next source')
+        tickers = _load_ticker_file(cache)
+        if tickers:
+            if cache is web_cache and _is_stale(cache):
+                stale = tickers
+                continue
+            return tickers
+    # Primary: plain CSV constituents list (no HTML parsing needed)
+    try:
+        resp = requests.get(SP500_CONSTITUENTS_URL, timeout=10)
+        resp.raise_for_status()
+        reader = csv.DictReader(io.StringIO(resp.text))
+        tickers = [row['Symbol'].strip().replace('.', '-') for row in reader if row.get('Symbol')]
+        if tickers:
+            _save_tickers(web_cache, tickers)
+            return tickers
+    except Exception as e:
+        logger.debug(f"Constituents CSV fetch failed for S&P500: {e}")
+
     url = "https://en.wikipedia.org/wiki/List_of_S%26P_500_companies"
-    # Primary: pandas.read_html (fast when lxml/html5lib installed)
+    # Fallback: read just the Symbol column of the Wikipedia table with lxml
+    try:
+        resp = requests.get(url, timeout=10)
+        resp.raise_for_status()
+        tickers = _table_symbols(resp.content)
+        if tickers:
+            _save_tickers(web_cache, tickers)
+            return tickers
+    except Exception as e:
+        logger.debug(f"lxml table extraction failed for S&P500: {e}")
+
+    # Then pandas.read_html (parses every table on the page)
     try:
         tables = pd.read_html(url)
         df = tables[0]
         tickers = df['Symbol'].tolist()
         tickers = [t.replace('.', '-') for t in tickers]
+        _save_tickers(web_cache, tickers)
         return tickers
     except Exception as e:
         msg = str(e)
@@ -339,7 +609,7 @@ def get_sp500_tickers() -> List[str]:
         if "Missing optional dependency" in msg or "lxml" in msg:
             logger.error("HTML parser dependency missing (lxml/html5lib). Install requirements: pip install -r requirements.txt")
 
-    # Secondary fallback: parse with requests + BeautifulSoup (if installed)
+    # Last resort: parse with requests + BeautifulSoup (if installed)
     try:
         from bs4 import BeautifulSoup
         resp = requests.get(url, timeout=10)
@@ -358,12 +628,17 @@ def get_sp500_tickers() -> List[str]:
                 if sym:
                     tickers.append(sym.replace('.', '-'))
             if tickers:
+                _save_tickers(web_cache, tickers)
                 return tickers
     except Exception as e:
         logger.debug(f"BeautifulSoup fallback failed for S&P500: {e}")
         if isinstance(e, ImportError):
             logger.error("BeautifulSoup not installed. Install with: pip install beautifulsoup4")
 
+    if stale:
+        logger.warning(f"Could not refresh S&P 500 list; using stale cache at {web_cache}")
+        return stale
+
     logger.error("Could not fetch S&P 500 list automatically; returning fallback sample list")
     return [
         'AAPL', 'MSFT', 'GOOGL', 'AMZN', 'TSLA',
@@ -373,6 +648,13 @@ def get_sp500_tickers() -> List[str]:
     ]
 
 
+def _extract_html_tickers(html: bytes) -> List[str]:
+    """Pull the sorted, unique ticker symbols out of a saved HTML listing page."""
+    symbols = {m.group(1) for m in _TICKER_RE.finditer(html)} - _NON_TICKER_WORDS
+    return [s.decode('ascii') for s in sorted(symbols)]
+
+
+@_memoize_tickers
 def get_russell3000_tickers() -> List[str]:
     """Get Russell 3000 tickers (comprehensive US market: ~3000 largest companies).
     
@@ -380,26 +662,24 @@ def get_russell3000_tickers() -> List[str]:
     
     To update the cache:
     1. Download from: https://www.kibot.com/Historical_Data/Russell_3000_Historical_Tick_Data.aspx
-    2. Save HTML page to data/Russell_3000_Historical_Tick_Data.html
-    3. Run: python3 -c "
-        import re; from pathlib import Path
-        html = Path('data/Russell 3000 Historical Tick Data.html').read_text()
-        tickers = sorted(set(re.findall(r'>([A-Z]{1,5})<', html)))
-        common = {'HTML', 'BODY', 'FORM', 'DIV', 'SPAN', 'TYPE', 'NAME', 'HREF', 'STYLE', 'CLASS', 'DATA', 'TEXT'}
-        tickers = [t for t in tickers if t not in common and len(t) <= 5]
-        Path('data/russell3000.txt').write_text('\\n'.join(tickers))
-    "
+    2. Save HTML page to data/Russell 3000 Historical Tick Data.html
+    3. Delete cache/russell3000.txt and data/russell3000.txt; the next run parses
+       the page and writes data/russell3000.txt
     """
     cache_priorities = [Path('cache/russell3000.txt'), Path('data/russell3000.txt')]
     for cache in cache_priorities:
-        if cache.exists():
-            try:
-                with cache.open() as f:
-                    tickers = [l.strip().upper().replace('.', '-') for l in f if l.strip()]
-                    if tickers:
-                        return tickers
-            except Exception:
-                logger.debug(f'Failed to read local Russell 3000 cache at {cache}')
+        tickers = _load_ticker_file(cache)
+        if tickers:
+            return tickers
+
+    if RUSSELL3000_HTML.exists():
+        try:
+            tickers = _extract_html_tickers(RUSSELL3000_HTML.read_bytes())
+            if tickers:
+                _save_tickers(Path('data/russell3000.txt'), tickers)
+                return tickers
+        except OSError as e:
+            logger.debug(f'Failed to read saved Russell 3000 page at {RUSSELL3000_HTML}: {e}')
 
     logger.warning('Russell 3000 cache not found in cache/ or data/')
     logger.warning('Download from: https://www.kibot.com/Historical_Data/Russell_3000_Historical_Tick_Data.aspx')
@@ -407,6 +687,7 @@ def get_russell3000_tickers() -> List[str]:
     return []
 
 
+@_memoize_tickers
 def get_russell2000_tickers() -> List[str]:
     """Get Russell 2000 tickers (small/mid-cap subset of Russell 3000).
     
@@ -415,14 +696,9 @@ def get_russell2000_tickers() -> List[str]:
     """
     cache_priorities = [Path('cache/russell2000.txt'), Path('data/russell2000.txt')]
     for cache in cache_priorities:
-        if cache.exists():
-            try:
-                with cache.open() as f:
-                    tickers = [l.strip().upper().replace('.', '-') for l in f if l.strip()]
-                    if tickers:
-                        return tickers
-            except Exception:
-                logger.debug(f'Failed to read local Russell2000 cache at {cache}')
+        tickers = _load_ticker_file(cache)
+        if tickers:
+            return tickers
 
     # Fall back to Russell 3000 (full universe)
     r3000 = get_russell3000_tickers()
@@ -433,20 +709,32 @@ def get_russell2000_tickers() -> List[str]:
     return []
 
 
+@_memoize_tickers
 def get_nasdaq100_tickers() -> List[str]:
     """Fetch Nasdaq-100 tickers from Wikipedia where possible; fallback to a small sample."""
     url = 'https://en.wikipedia.org/wiki/Nasdaq-100'
     # Prefer local cache if available
-    cache_priorities = [Path('cache/nasdaq100.txt'), Path('data/nasdaq100.txt')]
+    web_cache = Path('data/nasdaq100.txt')
+    cache_priorities = [Path('cache/nasdaq100.txt'), web_cache]
+    stale = []
     for cache in cache_priorities:
-        if cache.exists():
-            try:
-                with cache.open() as f:
-                    tickers = [l.strip().upper().replace('.', '-') for l in f if l.strip()]
-                    if tickers:
-                        return tickers
-            except Exception:
-                logger.debug(f'Failed to read local Nasdaq100 cache at {cache}; falling back to web fetch')
+        tickers = _load_ticker_file(cache)
+        if tickers:
+            if cache is web_cache and _is_stale(cache):
+                stale = tickers
+                continue
+            return tickers
+
+    try:
+        import requests
+        resp = requests.get(url, timeout=10)
+        resp.raise_for_status()
+        tickers = _table_symbols(resp.content)
+        if tickers:
+            _save_tickers(web_cache, tickers)
+            return tickers
+    except Exception as e:
+        logger.debug(f"lxml table extraction failed for Nasdaq-100: {e}")
 
     try:
         tables = pd.read_html(url)
@@ -458,6 +746,7 @@ def get_nasdaq100_tickers() -> List[str]:
                     col = col_candidates[0]
                     tickers = t[col].astype(str).tolist()
                     tickers = [s.strip().replace('.', '-') for s in tickers if s and isinstance(s, str)]
+                    _save_tickers(web_cache, tickers)
                     return tickers
     except Exception as e:
         msg = str(e)
@@ -483,37 +772,47 @@ def get_nasdaq100_tickers() -> List[str]:
                     if sym:
                         tickers.append(sym.replace('.', '-'))
                 if tickers:
+                    _save_tickers(web_cache, tickers)
                     return tickers
         except Exception as e:
             logger.debug(f"BeautifulSoup fallback failed for Nasdaq-100: {e}")
             logger.warning('Could not fetch Nasdaq-100 tickers automatically; returning fallback sample list')
 
+    if stale:
+        logger.warning(f"Could not refresh Nasdaq-100 list; using stale cache at {web_cache}")
+        return stale
+
     return [
         'AAPL', 'MSFT', 'AMZN', 'NVDA', 'TSLA', 'GOOGL', 'META', 'PYPL', 'INTC', 'AMD'
     ]
 
 
+@_memoize_tickers
 def get_all_market_tickers() -> List[str]:
     """Combine several universes to produce a broader market list.
 
     Currently combines S&P 500, Russell 2000 and Nasdaq-100 (de-duplicated).
     This produces a wide opportunity cone without attempting to fetch every single stock on the exchanges.
     """
-    sp = []
-    r2 = []
-    nq = []
-    try:
-        sp = get_sp500_tickers()
-    except Exception as e:
-        logger.debug(f"SP500 fetch failed in aggregator: {e}")
-    try:
-        r2 = get_russell2000_tickers()
-    except Exception as e:
-        logger.debug(f"Russell2000 fetch failed in aggregator: {e}")
-    try:
-        nq = get_nasdaq100_tickers()
-    except Exception as e:
-        logger.debug(f"Nasdaq100 fetch failed in aggregator: {e}")
+    # Each loader may hit the web; fetch them concurrently so the wait is the slowest one
+    loaders = (get_sp500_tickers, get_russell2000_tickers, get_nasdaq100_tickers)
+    with ThreadPoolExecutor(max_workers=len(loaders)) as executor:
+        futures = [executor.submit(loader) for loader in loaders]
+    sources = []
+    for loader, future in zip(loaders, futures):
+        try:
+            sources.append(future.result())
+        except Exception as e:
+            logger.debug(f"{loader.__name__} failed in aggregator: {e}")
 
-    combined = list(dict.fromkeys([t.upper() for t in (sp or []) + (r2 or []) + (nq or [])]))
+    # Hash-based dedup on normalized symbols (BRK.B and brk-b are the same listing),
+    # keeping first-seen order so S&P 500 names lead when --limit is applied
+    seen = set()
+    combined = []
+    for source in sources:
+        for t in source or ():
+            symbol = t.strip().upper().replace('.', '-')
+            if symbol and symbol not in seen:
+                seen.add(symbol)
+                combined.append(symbol)
     return combined
@@ -12,7 +12,9 @@ Key Principles:
 5. Quality Screening - Avoid value traps (cheap but declining)
 """
 
+import bisect
 import logging
+from types import MappingProxyType
 from typing import Dict, Optional, Tuple
 import math
 
@@ -89,6 +91,22 @@ SECTOR_PROFILES = {
     },
 }
 
+# Read-only view, safe to share across analysis threads
+SECTOR_PROFILES = MappingProxyType({
+    sector: MappingProxyType(dict(profile, tickers=frozenset(profile['tickers'])))
+    for sector, profile in SECTOR_PROFILES.items()
+})
+
+# Ticker -> (growth_rate, sector_name); a ticker listed in several sectors keeps the first
+_TICKER_TO_SECTOR = {}
+for _sector, _profile in SECTOR_PROFILES.items():
+    for _ticker in _profile['tickers']:
+        _TICKER_TO_SECTOR.setdefault(_ticker, (_profile['base_growth'], _sector))
+
+# Default: use conservative growth rate
+# (assumes mature company or unfamiliar ticker)
+DEFAULT_SECTOR = (0.04, 'UNKNOWN')
+
 
 class ValuationCalculator:
     """
@@ -105,6 +123,9 @@ class ValuationCalculator:
     RISK_FREE_RATE = 0.045  # 10-year Treasury yield approximation
     MARKET_RISK_PREMIUM = 0.055  # Historical equity premium
     BETA_MARKET = 1.0
+    DEBT_TO_EQUITY = 0.5
+    # calculate_wacc() with the defaults above, computed once
+    DEFAULT_WACC = (RISK_FREE_RATE + BETA_MARKET * MARKET_RISK_PREMIUM) / (1 + DEBT_TO_EQUITY)
     
     # Quality-adjusted margin of safety
     # High quality (ROE >20%, ROIC >15%) can warrant lower MOS
@@ -114,6 +135,19 @@ class ValuationCalculator:
     MARGIN_OF_SAFETY_LOW_QUALITY = 0.50     # 50% for mediocre businesses
     MARGIN_OF_SAFETY_POOR_QUALITY = 0.65    # 65% for poor businesses
     
+    # Quality tiers: a return >= QUALITY_THRESHOLDS[i - 1] lands in tier i
+    # Exceptional ROE (40%+) gets a 15% MOS - can pay 85% of IV (justified by moat)
+    QUALITY_THRESHOLDS = (0.08, 0.10, 0.15, 0.20, 0.25, 0.40)
+    QUALITY_TIERS = (
+        ('WEAK', MARGIN_OF_SAFETY_POOR_QUALITY),
+        ('POOR', MARGIN_OF_SAFETY_LOW_QUALITY),
+        ('ADEQUATE', MARGIN_OF_SAFETY_MEDIUM_QUALITY),
+        ('GOOD', MARGIN_OF_SAFETY_HIGH_QUALITY),
+        ('EXCELLENT', MARGIN_OF_SAFETY_HIGH_QUALITY),
+        ('EXCELLENT', MARGIN_OF_SAFETY_HIGH_QUALITY),
+        ('EXCEPTIONAL', 0.15),
+    )
+    
     # Value trap thresholds
     VALUE_TRAP_FCF_YIELD_MIN = 0.15  # >15% FCF yield is suspicious
     VALUE_TRAP_ROE_MAX = 0.10         # <10% ROE is concerning
@@ -230,15 +264,7 @@ class ValuationCalculator:
         Returns:
             Tuple of (growth_rate, sector_name)
         """
-        ticker_upper = ticker.upper()
-        
-        for sector, profile in SECTOR_PROFILES.items():
-            if ticker_upper in profile['tickers']:
-                return profile['base_growth'], sector
-        
-        # Default: use conservative growth rate
-        # (assumes mature company or unfamiliar ticker)
-        return 0.04, 'UNKNOWN'
+        return _TICKER_TO_SECTOR.get(ticker.upper(), DEFAULT_SECTOR)
     
     @classmethod
     def calculate_quality_rating(
@@ -262,28 +288,9 @@ class ValuationCalculator:
         # Use ROE as primary metric if ROIC not available
         primary_return = roic if roic is not None and roic > 0 else roe
         
-        # Special category for exceptional ROE businesses
-        if primary_return >= 0.40:
-            quality = 'EXCEPTIONAL'
-            mos = 0.15  # Can pay 85% of IV for these (justified by moat)
-        elif primary_return >= 0.25:
-            quality = 'EXCELLENT'
-            mos = cls.MARGIN_OF_SAFETY_HIGH_QUALITY
-        elif primary_return >= 0.20:
-            quality = 'EXCELLENT'
-            mos = cls.MARGIN_OF_SAFETY_HIGH_QUALITY
-        elif primary_return >= 0.15:
-            quality = 'GOOD'
-            mos = cls.MARGIN_OF_SAFETY_HIGH_QUALITY
-        elif primary_return >= 0.10:
-            quality = 'ADEQUATE'
-            mos = cls.MARGIN_OF_SAFETY_MEDIUM_QUALITY
-        elif primary_return >= 0.08:
-            quality = 'POOR'
-            mos = cls.MARGIN_OF_SAFETY_LOW_QUALITY
-        else:
-            quality = 'WEAK'
-            mos = cls.MARGIN_OF_SAFETY_POOR_QUALITY
+        # Binary search over the tier thresholds (a NaN return is WEAK)
+        tier = 0 if math.isnan(primary_return) else bisect.bisect_right(cls.QUALITY_THRESHOLDS, primary_return)
+        quality, mos = cls.QUALITY_TIERS[tier]
         
         return {
             'quality': quality,
@@ -306,32 +313,33 @@ class ValuationCalculator:
         - Danger: dividend can't be sustained, business deteriorating
         
         Returns:
-            Dict with value trap analysis
+            Dict with value trap analysis (reasons are only spelled out for traps)
         """
         if current_price <= 0:
             return {'is_trap': False, 'trap_score': 0, 'reasons': []}
         
         fcf_yield = fcf_per_share / current_price if fcf_per_share > 0 else 0
-        trap_score = 0
-        reasons = []
         
         # Signal 1: Unusually high FCF yield
-        if fcf_yield > cls.VALUE_TRAP_FCF_YIELD_MIN:
-            trap_score += 0.4
-            reasons.append(f"Very high FCF yield ({fcf_yield:.1%}) - may not be sustainable")
-        
+        high_yield = fcf_yield > cls.VALUE_TRAP_FCF_YIELD_MIN
         # Signal 2: Low ROE (poor capital efficiency)
-        if roe < cls.VALUE_TRAP_ROE_MAX:
-            trap_score += 0.3
-            reasons.append(f"Low ROE ({roe:.1%}) - weak capital efficiency")
-        
+        low_roe = roe < cls.VALUE_TRAP_ROE_MAX
         # Signal 3: Very low growth + high yield = mature/declining
-        if growth_rate <= 0.03 and fcf_yield > 0.10:
-            trap_score += 0.3
-            reasons.append("Low growth + high yield profile suggests secular decline")
+        declining = growth_rate <= 0.03 and fcf_yield > 0.10
         
+        trap_score = 0.4 * high_yield + 0.3 * low_roe + 0.3 * declining
         is_trap = trap_score >= cls.VALUE_TRAP_SCORE_THRESHOLD
         
+        # Most stocks aren't traps, so only they pay for formatting the reasons
+        reasons = []
+        if is_trap:
+            if high_yield:
+                reasons.append(f"Very high FCF yield ({fcf_yield:.1%}) - may not be sustainable")
+            if low_roe:
+                reasons.append(f"Low ROE ({roe:.1%}) - weak capital efficiency")
+            if declining:
+                reasons.append("Low growth + high yield profile suggests secular decline")
+        
         return {
             'is_trap': is_trap,
             'trap_score': trap_score,
@@ -344,7 +352,7 @@ class ValuationCalculator:
         risk_free_rate: float = RISK_FREE_RATE,
         market_risk_premium: float = MARKET_RISK_PREMIUM,
         beta: float = 1.0,
-        debt_to_equity: float = 0.5
+        debt_to_equity: float = DEBT_TO_EQUITY
     ) -> float:
         """
         Calculate Weighted Average Cost of Capital.
@@ -403,25 +411,22 @@ class ValuationCalculator:
         terminal_growth_rate = min(terminal_growth_rate, 0.025)
         
         if wacc is None:
-            wacc = cls.calculate_wacc()
+            wacc = cls.DEFAULT_WACC
         
         if wacc <= growth_rate:
-            logger.warning(f"WACC ({wacc:.2%}) <= Growth Rate ({growth_rate:.2%}), returning simplified estimate")
+            logger.warning("WACC (%.2f%%) <= Growth Rate (%.2f%%), returning simplified estimate",
+                           wacc * 100, growth_rate * 100)
             return fcf_per_share * (1 + growth_rate) / (wacc + 0.01), 0
         
-        # DCF calculation
-        pv_fcf = 0
-        current_fcf = fcf_per_share
-        
-        for year in range(1, projection_years + 1):
-            current_fcf *= (1 + growth_rate)
-            discount_factor = (1 + wacc) ** year
-            pv_fcf += current_fcf / discount_factor
+        # DCF calculation: the projected FCFs discount to a geometric series
+        # sum(r**t, t=1..N) with r = (1+g)/(1+wacc) < 1, summed in closed form
+        ratio = (1 + growth_rate) / (1 + wacc)
+        ratio_n = ratio ** projection_years
+        pv_fcf = fcf_per_share * ratio * (1 - ratio_n) / (1 - ratio)
         
-        # Terminal value using perpetuity growth model
-        terminal_fcf = current_fcf * (1 + terminal_growth_rate)
-        terminal_value = terminal_fcf / (wacc - terminal_growth_rate)
-        pv_terminal = terminal_value / ((1 + wacc) ** projection_years)
+        # Terminal value using perpetuity growth model; year-N FCF discounted
+        # back N years is fcf_per_share * ratio_n, so no further powers are needed
+        pv_terminal = fcf_per_share * ratio_n * (1 + terminal_growth_rate) / (wacc - terminal_growth_rate)
         
         intrinsic_value = pv_fcf + pv_terminal
         
@@ -534,12 +539,11 @@ class ValuationCalculator:
             roic = cls.calculate_roic(nopat, invested_capital)
         
         # Get sector-specific growth rate if not provided
+        sector_growth, sector = cls.get_sector_growth_rate(ticker)
         if growth_rate is None:
-            growth_rate, sector = cls.get_sector_growth_rate(ticker)
-        else:
-            _, sector = cls.get_sector_growth_rate(ticker)
+            growth_rate = sector_growth
         
-        wacc = cls.calculate_wacc()
+        wacc = cls.DEFAULT_WACC
         
         # Calculate intrinsic value with sector-aware growth
         intrinsic_value, _ = cls.calculate_intrinsic_value(
@@ -2,11 +2,19 @@
 Unit tests for stock valuation components.
 """
 
+import asyncio
+import tempfile
+import threading
+import time
 import unittest
 from unittest.mock import Mock, patch
+import numpy as np
+import pandas as pd
 from src.valuation_calculator import ValuationCalculator
-from src.data_fetcher import DataFetcher
-from src.recommender import StockRecommender
+from src.data_fetcher import DataFetcher, RateLimiter, YfData, _fetch_info, _flatten_quote_summary, _with_backoff
+from src.disk_cache import DiskCache
+from main import parse_args
+from src.recommender import StockRecommender, merge_recommendations, _extract_html_tickers, _table_symbols
 
 
 class TestValuationCalculator(unittest.TestCase):
@@ -159,48 +167,353 @@ class TestDataFetcher(unittest.TestCase):
     """Test DataFetcher methods."""
     
     def setUp(self):
-        self.fetcher = DataFetcher(cache_enabled=True)
+        self.fetcher = DataFetcher(cache_enabled=True, cache_dir=None)
+    
+    @staticmethod
+    def _ticker_factory(info=None):
+        """Fake yf.Ticker constructor whose Tickers return the given info."""
+        return Mock(return_value=Mock(info=info if info is not None else {'currentPrice': 100}))
     
     def test_cache_functionality(self):
         """Test that caching works."""
-        # Mock yfinance
-        with patch('data_fetcher.yf.Ticker') as mock_ticker:
-            mock_stock = Mock()
-            mock_stock.info = {'currentPrice': 100}
-            mock_ticker.return_value = mock_stock
-            
-            # First call - should fetch
-            result1 = self.fetcher.get_stock_info('TEST')
-            self.assertEqual(result1['currentPrice'], 100)
-            
-            # Second call - should use cache
-            result2 = self.fetcher.get_stock_info('TEST')
-            self.assertEqual(result2['currentPrice'], 100)
-            # Verify mock was only called once (cached second time)
-            self.assertEqual(mock_ticker.call_count, 1)
+        ticker_factory = self._ticker_factory()
+        fetcher = DataFetcher(cache_enabled=True, cache_dir=None, ticker_factory=ticker_factory)
+        
+        # First call - should fetch
+        result1 = fetcher.get_stock_info('TEST')
+        self.assertEqual(result1['currentPrice'], 100)
+        
+        # Second call - should use cache
+        result2 = fetcher.get_stock_info('TEST')
+        self.assertEqual(result2['currentPrice'], 100)
+        # Verify the Ticker was only built once (cached second time)
+        self.assertEqual(ticker_factory.call_count, 1)
     
     def test_cache_disabled(self):
         """Test that cache can be disabled."""
-        fetcher_no_cache = DataFetcher(cache_enabled=False)
+        ticker_factory = self._ticker_factory()
+        fetcher_no_cache = DataFetcher(cache_enabled=False, cache_dir=None, ticker_factory=ticker_factory)
         
-        with patch('data_fetcher.yf.Ticker') as mock_ticker:
-            mock_stock = Mock()
-            mock_stock.info = {'currentPrice': 100}
-            mock_ticker.return_value = mock_stock
-            
-            # Both calls should fetch
-            fetcher_no_cache.get_stock_info('TEST')
-            fetcher_no_cache.get_stock_info('TEST')
-            
-            # Mock should be called twice (no caching)
-            self.assertEqual(mock_ticker.call_count, 2)
+        # Both calls should fetch
+        fetcher_no_cache.get_stock_info('TEST')
+        fetcher_no_cache.get_stock_info('TEST')
+        
+        # A fresh Ticker each time (no caching)
+        self.assertEqual(ticker_factory.call_count, 2)
+
+    def test_flatten_quote_summary(self):
+        """Test that quoteSummary modules merge into one info dict."""
+        data = {'quoteSummary': {'result': [{
+            'price': {'regularMarketPrice': {'raw': 10.0, 'fmt': '10.00'}},
+            'financialData': {'currentPrice': 10.5, 'operatingCashflow': 5e9},
+            'defaultKeyStatistics': {'sharesOutstanding': 1e9, 'bookValue': None},
+        }]}}
+        
+        info = _flatten_quote_summary(data)
+        
+        self.assertEqual(info, {
+            'regularMarketPrice': 10.0,
+            'currentPrice': 10.5,
+            'operatingCashflow': 5e9,
+            'sharesOutstanding': 1e9,
+        })
+        self.assertEqual(_flatten_quote_summary({'quoteSummary': {'result': None}}), {})
+    
+    @unittest.skipIf(YfData is None, 'yfinance internals unavailable')
+    def test_fetch_info_falls_back_to_info(self):
+        """Test a changed private API falls back to the Ticker's .info."""
+        client = Mock(spec=YfData)
+        client.get_raw_json.side_effect = TypeError('unexpected keyword argument')
+        stock = Mock(_data=client, ticker='TEST', info={'currentPrice': 100})
+        
+        self.assertEqual(_fetch_info(stock), {'currentPrice': 100})
+    
+    @unittest.skipIf(YfData is None, 'yfinance internals unavailable')
+    def test_fetch_info_no_data_skips_info(self):
+        """Test an empty payload or a 404 returns {} without the .info request."""
+        not_found = RuntimeError('Not Found')
+        not_found.response = Mock(status_code=404)
+        client = Mock(spec=YfData)
+        stock = Mock(_data=client, ticker='GONE', info={'currentPrice': 100})
+        
+        client.get_raw_json.return_value = {'quoteSummary': {'result': None}}
+        self.assertEqual(_fetch_info(stock), {})
+        client.get_raw_json.side_effect = not_found
+        self.assertEqual(_fetch_info(stock), {})
+        
+        client.get_raw_json.side_effect = RuntimeError('crumb rejected')
+        with self.assertRaises(RuntimeError):
+            _fetch_info(stock)
+    
+    def test_memory_cache_is_bounded(self):
+        """Test that the in-memory cache evicts the least recently used ticker."""
+        ticker_factory = self._ticker_factory()
+        fetcher = DataFetcher(cache_enabled=True, cache_dir=None, ticker_factory=ticker_factory)
+        fetcher.stock_cache.maxsize = 2
+        
+        fetcher.get_stock_info('A')
+        fetcher.get_stock_info('B')
+        fetcher.get_stock_info('A')
+        fetcher.get_stock_info('C')
+        
+        self.assertEqual(list(fetcher.stock_cache), ['A', 'C'])
+        fetcher.clear_cache()
+        self.assertEqual(len(fetcher.stock_cache), 0)
+
+    def test_batch_get_metrics(self):
+        """Test concurrent batch fetch skips tickers without data."""
+        with patch.object(self.fetcher, 'get_metrics') as mock_get_metrics, \
+                patch.object(self.fetcher, 'bulk_prefetch'):
+            mock_get_metrics.side_effect = lambda t: {'ticker': t} if t != 'BAD' else None
+
+            results = self.fetcher.batch_get_metrics(['AAA', 'BAD', 'CCC'], delay=0)
+
+            self.assertEqual(set(results), {'AAA', 'CCC'})
+            self.assertEqual(mock_get_metrics.call_count, 3)
+
+    def test_batch_get_metrics_async(self):
+        """Test the async batch returns the same results as the threaded one."""
+        def fake_metrics(ticker):
+            if ticker == 'ERR':
+                raise RuntimeError('boom')
+            return None if ticker == 'BAD' else {'ticker': ticker}
+
+        with patch.object(self.fetcher, 'get_metrics', side_effect=fake_metrics), \
+             patch.object(self.fetcher, 'bulk_prefetch'):
+            results = asyncio.run(self.fetcher.batch_get_metrics_async(['AAA', 'BAD', 'ERR', 'CCC']))
+
+        self.assertEqual(sorted(results), ['AAA', 'CCC'])
+
+    def test_batch_get_metrics_async_cancel_does_not_block(self):
+        """Test cancelling the async batch returns without waiting on in-flight fetches."""
+        release = threading.Event()
+
+        def slow_metrics(ticker):
+            release.wait(5)
+            return {'ticker': ticker}
+
+        async def cancel_soon():
+            task = asyncio.ensure_future(self.fetcher.batch_get_metrics_async(['AAA', 'BBB']))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            started = time.monotonic()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            return time.monotonic() - started
+
+        with patch.object(self.fetcher, 'get_metrics', side_effect=slow_metrics), \
+             patch.object(self.fetcher, 'bulk_prefetch'):
+            try:
+                elapsed = asyncio.run(cancel_soon())
+            finally:
+                release.set()
+
+        self.assertLess(elapsed, 1)
+
+    def test_extract_metrics_uses_first_available_alias(self):
+        """Test statement lookups skip missing/NaN aliases in preference order."""
+        def statement(rows):
+            return pd.DataFrame({'2024-09-30': rows, '2024-06-30': rows})
+
+        financials = {
+            'cash_flow': statement({
+                'Operating Cash Flow': np.nan,
+                'Net Cash From Operating Activities': 500.0,
+                'Purchases of Property Plant and Equipment': -100.0,
+            }),
+            'income_stmt': statement({'Net Income': 200.0}),
+            'balance_sheet': statement({'Common Stock Equity': 1000.0}),
+        }
+        info = {'currentPrice': 10.0, 'sharesOutstanding': 100.0}
+
+        metrics = self.fetcher.extract_metrics('TEST', info, financials)
+
+        self.assertEqual(metrics['operating_cash_flow'], 500.0)
+        self.assertEqual(metrics['capex'], 100.0)
+        self.assertEqual(metrics['net_income'], 200.0)
+        self.assertEqual(metrics['total_equity'], 1000.0)
+
+    def test_empty_statements_are_not_persisted(self):
+        """Test empty statement frames (yfinance's failure result) skip the disk cache."""
+        stock = Mock(
+            quarterly_cash_flow=pd.DataFrame(),
+            quarterly_income_stmt=pd.DataFrame({'2024-09-30': [1.0]}),
+            quarterly_balance_sheet=pd.DataFrame({'2024-09-30': [1.0]}),
+        )
+        with tempfile.TemporaryDirectory() as cache_dir:
+            fetcher = DataFetcher(cache_dir=cache_dir, ticker_factory=Mock(return_value=stock))
+            fetcher.get_financial_statements('TEST')
+
+            self.assertIsNone(fetcher.disk_cache.get(('TEST', 'statements')))
+            fetcher.disk_cache.close()
+
+    def test_get_metrics_skips_statements_without_quote(self):
+        """Test tickers with no price are rejected before statements are fetched."""
+        info = {'sharesOutstanding': 100.0, 'regularMarketPrice': None}
+
+        with patch.object(self.fetcher, 'get_stock_info', return_value=info), \
+             patch.object(self.fetcher, 'get_financial_statements') as statements:
+            self.assertIsNone(self.fetcher.get_metrics('TEST'))
+
+        statements.assert_not_called()
+
+    def test_get_metrics_shares_one_ticker_per_fetch(self):
+        """Test cache misses share one pooled Ticker that is released afterwards."""
+        ticker_factory = self._ticker_factory({'currentPrice': 10.0, 'sharesOutstanding': 100.0})
+        fetcher = DataFetcher(cache_enabled=True, cache_dir=None, ticker_factory=ticker_factory)
+        fetcher.get_metrics('TEST')
+
+        ticker_factory.assert_called_once()
+        self.assertEqual(fetcher._tickers, {})
+
+    def test_bulk_prefetch_chunks_requests(self):
+        """Test quotes are requested 20 symbols at a time and cached."""
+        tickers = [f'T{i}' for i in range(45)]
+
+        def fake_quotes(url, params=None):
+            symbols = params['symbols'].split(',')
+            return {'quoteResponse': {'result': [
+                {'symbol': s, 'regularMarketPrice': 10.0} for s in symbols
+            ]}}
+
+        with patch('src.data_fetcher.YfData') as mock_yf_data:
+            mock_yf_data.return_value.get_raw_json.side_effect = fake_quotes
+            cached = self.fetcher.bulk_prefetch(tickers)
+
+        self.assertEqual(cached, 45)
+        self.assertEqual(mock_yf_data.return_value.get_raw_json.call_count, 3)
+        self.assertEqual(self.fetcher.quote_cache['T44']['regularMarketPrice'], 10.0)
+        self.assertNotIn('T44', self.fetcher.stock_cache)
+
+    def test_get_metrics_rejects_unusable_prefetched_quote(self):
+        """Test tickers the batch quotes show without price or shares skip every request."""
+        quotes = {'quoteResponse': {'result': [
+            {'symbol': 'GOOD', 'regularMarketPrice': 10.0, 'sharesOutstanding': 100.0},
+            {'symbol': 'NOSHARES', 'regularMarketPrice': 10.0},
+        ]}}
+        with patch('src.data_fetcher.YfData') as mock_yf_data:
+            mock_yf_data.return_value.get_raw_json.return_value = quotes
+            cached = self.fetcher.bulk_prefetch(['GOOD', 'NOSHARES', 'GONE'])
+
+        self.assertEqual(cached, 2)
+        self.assertEqual(self.fetcher.quote_cache['GONE'], {})
+        with patch.object(self.fetcher, 'get_stock_info') as get_info:
+            self.assertIsNone(self.fetcher.get_metrics('NOSHARES'))
+            self.assertIsNone(self.fetcher.get_metrics('GONE'))
+        get_info.assert_not_called()
+
+    def test_prefetched_quotes_persist_apart_from_info(self):
+        """Test quotes saved by a prefetch are reused as quotes, not served as info."""
+        quotes = {'quoteResponse': {'result': [{'symbol': 'TEST', 'regularMarketPrice': 9.0}]}}
+        info = {'currentPrice': 10.0, 'operatingCashflow': 500.0}
+        with tempfile.TemporaryDirectory() as cache_dir:
+            with patch('src.data_fetcher.YfData') as mock_yf_data:
+                mock_yf_data.return_value.get_raw_json.return_value = quotes
+                DataFetcher(cache_dir=cache_dir).bulk_prefetch(['TEST'])
+
+                fetcher = DataFetcher(cache_dir=cache_dir, ticker_factory=self._ticker_factory(info))
+                self.assertEqual(fetcher.bulk_prefetch(['TEST']), 0)
+                self.assertEqual(mock_yf_data.return_value.get_raw_json.call_count, 1)
+
+            self.assertEqual(fetcher.quote_cache['TEST']['regularMarketPrice'], 9.0)
+            self.assertEqual(fetcher.get_stock_info('TEST')['operatingCashflow'], 500.0)
+            fetcher.disk_cache.close()
+
+    def test_prefetched_quote_does_not_replace_info(self):
+        """Test a prefetched quote only fills gaps in the full info dict."""
+        info = {'currentPrice': 10.0, 'operatingCashflow': 500.0, 'freeCashflow': 400.0}
+        fetcher = DataFetcher(cache_enabled=True, cache_dir=None, ticker_factory=self._ticker_factory(info))
+        fetcher.quote_cache['TEST'] = {'symbol': 'TEST', 'regularMarketPrice': 9.0, 'sharesOutstanding': 100.0}
+
+        result = fetcher.get_stock_info('TEST')
+
+        self.assertEqual(result['operatingCashflow'], 500.0)
+        self.assertEqual(result['freeCashflow'], 400.0)
+        self.assertEqual(result['currentPrice'], 10.0)
+        self.assertEqual(result['sharesOutstanding'], 100.0)
+
+
+class TestBackoff(unittest.TestCase):
+    """Test retry/backoff around Yahoo requests."""
+    
+    @staticmethod
+    def _http_error(status_code):
+        error = Exception(f"HTTP {status_code}")
+        error.response = Mock(status_code=status_code)
+        return error
+    
+    @patch('src.data_fetcher.time.sleep')
+    def test_retries_rate_limited_calls(self, mock_sleep):
+        """Test 429 responses are retried until the call succeeds."""
+        fn = Mock(side_effect=[self._http_error(429), self._http_error(429), 'ok'])
+        self.assertEqual(_with_backoff(fn), 'ok')
+        self.assertEqual(fn.call_count, 3)
+        self.assertEqual(mock_sleep.call_count, 2)
+    
+    @patch('src.data_fetcher.time.sleep')
+    def test_other_errors_are_not_retried(self, mock_sleep):
+        """Test non-throttling errors propagate immediately."""
+        fn = Mock(side_effect=self._http_error(404))
+        with self.assertRaises(Exception):
+            _with_backoff(fn)
+        self.assertEqual(fn.call_count, 1)
+        mock_sleep.assert_not_called()
+
+    @patch('src.data_fetcher.time.sleep')
+    def test_rate_limiter_paces_after_burst(self, mock_sleep):
+        """Test the token bucket only waits once the burst is used up."""
+        limiter = RateLimiter(rate=10, burst=2)
+        limiter.acquire()
+        limiter.acquire()
+        mock_sleep.assert_not_called()
+        
+        mock_sleep.side_effect = lambda seconds: setattr(limiter, 'tokens', 1.0)
+        limiter.acquire()
+        self.assertEqual(mock_sleep.call_count, 1)
+        self.assertAlmostEqual(mock_sleep.call_args[0][0], 0.1, places=2)
+
+
+class TestDiskCache(unittest.TestCase):
+    """Test DiskCache persistence and expiry."""
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.cache = DiskCache(self.tmpdir.name)
+    
+    def tearDown(self):
+        self.cache.close()
+        self.tmpdir.cleanup()
+    
+    def test_roundtrip_across_instances(self):
+        """Test values persist for a new cache on the same directory."""
+        self.cache.set(('TEST', 'info'), {'currentPrice': 100}, expire=60)
+        reopened = DiskCache(self.tmpdir.name)
+        self.assertEqual(reopened.get(('TEST', 'info')), {'currentPrice': 100})
+        reopened.close()
+    
+    def test_expired_entry_is_ignored(self):
+        """Test expired entries read as missing."""
+        self.cache.set(('TEST', 'info'), {'currentPrice': 100}, expire=-1)
+        self.assertIsNone(self.cache.get(('TEST', 'info')))
+    
+    def test_delete(self):
+        """Test deleted entries read as missing."""
+        self.cache.set(('TEST', 'info'), {'currentPrice': 100}, expire=60)
+        self.cache.delete(('TEST', 'info'))
+        self.assertIsNone(self.cache.get(('TEST', 'info')))
+    
+    def test_delete_swallows_database_errors(self):
+        """Test delete on an unusable database is ignored like get/set."""
+        self.cache.close()
+        self.cache.delete(('TEST', 'info'))
+        self.assertIsNone(self.cache.get(('TEST', 'info')))
 
 
 class TestStockRecommender(unittest.TestCase):
     """Test StockRecommender methods."""
     
     def setUp(self):
-        self.recommender = StockRecommender()
+        self.recommender = StockRecommender(cache=False)
     
     def test_score_calculation_high_value(self):
         """Test score calculation for good opportunity."""
@@ -241,12 +554,36 @@ class TestStockRecommender(unittest.TestCase):
         self.assertLess(score, 25)  # Should score low
 
 
+class TestParseArgs(unittest.TestCase):
+    """Test command-line parsing."""
+    
+    def test_defaults(self):
+        """Test defaults when no arguments are given."""
+        args = parse_args([])
+        self.assertEqual(args.tickers, [])
+        self.assertEqual(args.workers, 16)
+        self.assertTrue(args.cache)
+    
+    def test_options(self):
+        """Test --workers and --no-cache."""
+        args = parse_args(['--workers', '4', '--no-cache'])
+        self.assertEqual(args.workers, 4)
+        self.assertFalse(args.cache)
+    
+    def test_tickers_mixed_with_options(self):
+        """Test tickers may appear on either side of options."""
+        args = parse_args(['AAPL', '--limit', '1', 'MSFT', '--no-cache'])
+        self.assertEqual(args.tickers, ['AAPL', 'MSFT'])
+        self.assertEqual(args.limit, 1)
+        self.assertFalse(args.cache)
+
+
 class TestIntegration(unittest.TestCase):
     """Integration tests with mock data."""
     
     def test_end_to_end_analysis(self):
         """Test complete analysis flow with mocked data."""
-        recommender = StockRecommender()
+        recommender = StockRecommender(cache=False)
         
         with patch.object(recommender.fetcher, 'get_metrics') as mock_get_metrics:
             mock_get_metrics.return_value = {
@@ -268,6 +605,91 @@ class TestIntegration(unittest.TestCase):
             self.assertIn('recommendation_score', analysis)
             self.assertGreater(analysis['recommendation_score'], 0)
 
+    def test_analyze_universe_concurrent(self):
+        """Test concurrent universe analysis ranks every successful ticker."""
+        recommender = StockRecommender(cache=False)
+
+        def fake_metrics(ticker):
+            if ticker == 'BAD':
+                return None
+            return {
+                'ticker': ticker,
+                'current_price': 50,
+                'shares_outstanding': 1000,
+                'operating_cash_flow': 10000,
+                'capex': 2000,
+                'free_cash_flow': 8000,
+                'net_income': 5000,
+                'total_equity': 50000,
+                'growth_rate': 0.06,
+            }
+
+        with patch.object(recommender.fetcher, 'get_metrics', side_effect=fake_metrics):
+            df = recommender.analyze_universe(['AAA', 'BAD', 'CCC'], top_n=5, max_workers=4)
+
+        self.assertEqual(sorted(df['Ticker']), ['AAA', 'CCC'])
+        self.assertEqual(len(recommender.analyses), 2)
+
+        with patch.object(recommender.fetcher, 'get_metrics', side_effect=fake_metrics):
+            df = recommender.analyze_universe(['AAA', 'BAD', 'CCC'], top_n=1, max_workers=4)
+
+        self.assertEqual(len(df), 1)
+        self.assertEqual([a['ticker'] for a in recommender.analyses], list(df['Ticker']))
+
+        scored_after = []
+        keep_top = recommender._keep_top
+
+        def spy_keep_top(batch, top_n):
+            scored_after.append(fetched.call_count)
+            keep_top(batch, top_n)
+
+        with patch('src.recommender.SCORE_BATCH_SIZE', 2), \
+             patch.object(recommender.fetcher, 'get_metrics', side_effect=fake_metrics) as fetched, \
+             patch.object(recommender, '_keep_top', side_effect=spy_keep_top):
+            df = recommender.analyze_universe(['AAA', 'BAD', 'CCC', 'DDD', 'EEE'], top_n=5, max_workers=4)
+
+        # Each window is fetched and scored before the next one is submitted
+        self.assertEqual(scored_after, [2, 4, 5])
+        self.assertEqual(len(df), 4)
+
+    def test_merge_recommendations(self):
+        """Test merged runs are re-ranked and keep each ticker's best row."""
+        def frame(rows):
+            return pd.DataFrame(rows, columns=['Ticker', 'discount_percent', 'recommendation_score'])
+
+        merged = merge_recommendations([
+            frame([('AAA', 30.0, 60.0), ('BBB', 20.0, 40.0)]),
+            frame([('CCC', 10.0, 50.0), ('AAA', 30.0, 70.0)]),
+            frame([]),
+        ])
+
+        self.assertEqual(list(merged['Ticker']), ['AAA', 'CCC', 'BBB'])
+        self.assertEqual(merged['recommendation_score'].iloc[0], 70.0)
+
+    def test_extract_html_tickers(self):
+        """Test ticker cells are extracted from saved HTML, minus markup words."""
+        html = (b'<html><td>MSFT</td><td>AAPL</td><b>HTML</b><td>MSFT</td><td>toolong</td><td>ABCDEF</td>'
+                b'<td>KEY</td><td>LOW</td></html>')
+
+        self.assertEqual(_extract_html_tickers(html), ['AAPL', 'KEY', 'LOW', 'MSFT'])
+
+    def test_table_symbols(self):
+        """Test the Symbol column is read from the constituents table only."""
+        html = (b'<table class="wikitable"><tr><th>Ticker</th></tr><tr><td>NOPE</td></tr></table>'
+                b'<table id="constituents"><tr><th>Symbol</th><th>Security</th></tr>'
+                b'<tr><td><a>MMM</a></td><td>3M</td></tr><tr><td><a>BRK.B</a></td><td>Berkshire</td></tr></table>')
+
+        self.assertEqual(_table_symbols(html), ['MMM', 'BRK-B'])
+
+    def test_analyze_universe_skips_duplicates(self):
+        """Test a ticker listed twice is only analyzed once."""
+        recommender = StockRecommender(cache=False)
+
+        with patch.object(recommender, '_analyze_unscored', return_value=None) as analyze:
+            recommender.analyze_universe(['AAA', 'BBB', 'AAA'], max_workers=1)
+
+        self.assertEqual([c.args[0] for c in analyze.call_args_list], ['AAA', 'BBB'])
+
 
 if __name__ == '__main__':
     unittest.main()